@@ -0,0 +1,44 @@
+"""Times practise_files/prac_fib_recursion.lox with a larger n on each engine.
+
+Usage: python benchmarks/fib_recursion.py [--n N] [--repeat R]
+"""
+
+import contextlib
+import io
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lox"))
+
+from Lox import Lox
+
+SCRIPT = ROOT / "practise_files" / "prac_fib_recursion.lox"
+
+
+def best_time(source: str, engine: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Lox().run(source, engine=engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = ArgumentParser(usage="fib_recursion.py [--n N] [--repeat R]")
+    arg_parser.add_argument("--n", type=int, default=25, help="Loop bound.")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = SCRIPT.read_text().replace("i < 20", "i < " + str(args.n))
+    print(f"prac_fib_recursion.lox with n = {args.n}, best of {args.repeat}")
+    for engine in ("tree", "closure", "vm"):
+        print(f"{engine:<8} {best_time(source, engine, args.repeat):8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
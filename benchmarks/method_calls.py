@@ -0,0 +1,85 @@
+"""Counts objects allocated per Lox method call on each engine.
+
+Usage: python benchmarks/method_calls.py [--calls N]
+"""
+
+import sys
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lox"))
+
+from ClosureCompiler import CompiledFunction
+from Environment import Environment
+from Lox import Lox
+from LoxFunction import LoxFunction
+from VM import VMFunction
+
+COUNTED = (Environment, LoxFunction, CompiledFunction, VMFunction)
+
+PROGRAM = """
+class Counter {
+  init() { this.count = 0; }
+  add(n) {
+    this.count = this.count + n;
+    return this.count;
+  }
+}
+var counter = Counter();
+while (counter.add(1) < %d) nil;
+"""
+
+
+def count_allocations(engine: str, calls: int) -> Counter:
+    counts = Counter()
+    originals = {}
+    for cls in COUNTED:
+        originals[cls] = cls.__init__
+
+        def counting_init(self, *args, __init__=cls.__init__, __name=cls.__name__):
+            counts[__name] += 1
+            __init__(self, *args)
+
+        cls.__init__ = counting_init
+    try:
+        Lox().run(PROGRAM % calls, engine=engine)
+    finally:
+        for cls, init in originals.items():
+            cls.__init__ = init
+    return counts
+
+
+def time_calls(engine: str, calls: int) -> float:
+    start = time.perf_counter()
+    Lox().run(PROGRAM % calls, engine=engine)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = ArgumentParser(usage="method_calls.py [--calls N]")
+    arg_parser.add_argument("--calls", type=int, default=20000)
+    args = arg_parser.parse_args()
+
+    print(f"{'engine':<8} {'allocs/call':>12}  {'us/call':>8}  breakdown")
+    for engine in ("tree", "closure", "vm"):
+        # The difference between two loop lengths cancels out the setup.
+        small = count_allocations(engine, 1)
+        large = count_allocations(engine, args.calls + 1)
+        per_call = {
+            name: (large[name] - small[name]) / args.calls
+            for name in large
+            if large[name] != small[name]
+        }
+        baseline = time_calls(engine, 1)
+        elapsed = time_calls(engine, args.calls + 1) - baseline
+        breakdown = ", ".join(f"{name}={n:g}" for name, n in sorted(per_call.items()))
+        print(
+            f"{engine:<8} {sum(per_call.values()):>12g}  "
+            f"{elapsed / args.calls * 1e6:>8.2f}  {breakdown}"
+        )
+
+
+if __name__ == "__main__":
+    main()
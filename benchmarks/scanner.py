@@ -0,0 +1,59 @@
+"""Compares tokens per second of Scanner and FastScanner on a large source.
+
+The input is built by repeating the practise programs until it reaches
+--size megabytes.
+
+Usage: python benchmarks/scanner.py [--size MB] [--repeat R]
+"""
+
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lox"))
+
+from FastScanner import FastScanner
+from Scanner import Scanner
+
+
+def generate_source(size: int) -> str:
+    sample = "\n".join(
+        path.read_text() for path in sorted((ROOT / "practise_files").glob("*.lox"))
+    )
+    sample += '\n// comment\nvar s = "a string"; var x = 12.5 * (3 - 1) != 4;\n'
+    return sample * (size // len(sample) + 1)
+
+
+def best_rate(scanner_class, source: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scanner_class(source).scan_tokens()
+        best = min(best, time.perf_counter() - start)
+    return tokens, len(tokens) / best
+
+
+def main():
+    arg_parser = ArgumentParser(usage="scanner.py [--size MB] [--repeat R]")
+    arg_parser.add_argument("--size", type=float, default=2.0)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    source = generate_source(int(args.size * 1024 * 1024))
+    print(f"{len(source) / 1024 / 1024:.1f} MB of source, best of {args.repeat}")
+
+    streams = []
+    for scanner_class in (Scanner, FastScanner):
+        tokens, rate = best_rate(scanner_class, source, args.repeat)
+        streams.append([(t.type, t.lexeme, t.literal, t.line) for t in tokens])
+        print(f"{scanner_class.__name__:<12} {rate:>12,.0f} tokens/s")
+
+    if streams[0] != streams[1]:
+        print("token streams differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Measures interpreter startup for an empty Lox script.
+
+Prints the wall time of `python main.py empty.lox` against a bare
+`python -c pass`, followed by the slowest imports reported by
+`python -X importtime`.
+
+Usage: python benchmarks/startup.py [--runs N] [--top N] [main.py options]
+"""
+
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+LOX = Path(__file__).resolve().parent.parent / "lox"
+
+
+def best_wall_time(command, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=LOX, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def import_times(command):
+    """Returns (cumulative microseconds, module) for every import."""
+    result = subprocess.run(
+        [command[0], "-X", "importtime"] + command[1:],
+        cwd=LOX,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        times.append((int(cumulative), module.rstrip()))
+    return times
+
+
+def main():
+    arg_parser = ArgumentParser(
+        usage="startup.py [--runs N] [--top N] [main.py options]"
+    )
+    arg_parser.add_argument("--runs", type=int, default=20)
+    arg_parser.add_argument("--top", type=int, default=15)
+    args, options = arg_parser.parse_known_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = Path(directory) / "empty.lox"
+        script.write_text("")
+        command = [sys.executable, "main.py"] + options + [str(script)]
+
+        bare = best_wall_time([sys.executable, "-c", "pass"], args.runs)
+        lox = best_wall_time(command, args.runs)
+        print(f"python -c pass       {bare * 1000:7.1f} ms")
+        print(f"main.py empty.lox    {lox * 1000:7.1f} ms")
+        print(f"startup overhead     {(lox - bare) * 1000:7.1f} ms")
+
+        times = import_times(command)
+        print()
+        print("slowest imports (cumulative, best of one run)")
+        for cumulative, module in sorted(times, reverse=True)[: args.top]:
+            print(f"{cumulative / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
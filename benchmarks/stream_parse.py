@@ -0,0 +1,71 @@
+"""Compares peak memory of parsing a large generated script in one piece
+against streaming it through StreamScanner and StreamParser. Times are
+inflated by tracemalloc and only meant for comparing the two.
+
+Usage: python benchmarks/stream_parse.py [--statements N]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lox"))
+
+from FastScanner import FastScanner
+from Parser import Parser
+from StreamParser import StreamParser
+from StreamScanner import StreamScanner
+
+STATEMENT = 'var v%d = (%d + 2) * 3 - "text" == nil; // comment\n'
+
+
+def parse_whole(path: Path) -> int:
+    source = path.read_text()
+    return len(Parser(FastScanner(source).scan_tokens()).parse())
+
+
+def parse_streaming(path: Path) -> int:
+    count = 0
+    with path.open() as reader:
+        parser = StreamParser(StreamScanner(reader).scan_tokens())
+        for _ in parser.declarations():
+            count += 1
+    return count
+
+
+def measure(parse, path: Path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = parse(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    arg_parser = ArgumentParser(usage="stream_parse.py [--statements N]")
+    arg_parser.add_argument("--statements", type=int, default=10000)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "generated.lox"
+        with path.open("w") as script:
+            for i in range(args.statements):
+                script.write(STATEMENT % (i, i))
+        size = path.stat().st_size
+        print(f"{args.statements} statements, {size / 1024 / 1024:.1f} MB")
+
+        for name, parse in (("whole", parse_whole), ("stream", parse_streaming)):
+            count, elapsed, peak = measure(parse, path)
+            print(
+                f"{name:<8} {count:>8} statements  {elapsed:6.2f} s  "
+                f"peak {peak / 1024 / 1024:8.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
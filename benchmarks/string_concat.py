@@ -0,0 +1,63 @@
+"""Times a Lox loop that builds a string with repeated '+'.
+
+Each engine runs s = s + piece for a growing number of appends. Strings
+built this way are Ropes, so the time per append should stay flat as the
+count grows; with ordinary strings it grows with the length of s.
+
+Usage: python benchmarks/string_concat.py [--engine ENGINE] [--piece TEXT]
+       [--counts N ...]
+"""
+
+import io
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lox"))
+
+from Lox import Lox
+
+SOURCE = """
+var s = "";
+for (var i = 0; i < {count}; i = i + 1) {{
+  s = s + "{piece}";
+}}
+print s == "";
+"""
+
+
+def run(engine: str, count: int, piece: str) -> float:
+    lox = Lox(stdout=io.StringIO())
+    interpreter = lox.interpreter()
+    statements = lox.parse(SOURCE.format(count=count, piece=piece), interpreter, True)
+    start = time.perf_counter()
+    Lox.runner(interpreter, engine).interpret(statements)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = ArgumentParser(
+        usage="string_concat.py [--engine ENGINE] [--piece TEXT] [--counts N ...]"
+    )
+    arg_parser.add_argument(
+        "--engine", choices=("tree", "closure", "vm"), action="append"
+    )
+    arg_parser.add_argument("--piece", default="line of text")
+    arg_parser.add_argument(
+        "--counts", type=int, nargs="+", default=[25000, 50000, 100000]
+    )
+    args = arg_parser.parse_args()
+
+    print(f"{'engine':<8} {'appends':>8} {'ms':>9} {'us/append':>10}")
+    for engine in args.engine or ("tree", "closure", "vm"):
+        for count in args.counts:
+            elapsed = run(engine, count, args.piece)
+            print(
+                f"{engine:<8} {count:8d} {elapsed * 1000:9.1f} "
+                f"{elapsed * 1_000_000 / count:10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
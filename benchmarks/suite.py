@@ -0,0 +1,291 @@
+"""Runs generated Lox workloads phase by phase and checks them against a
+stored baseline.
+
+Each workload is scanned, parsed, resolved, optimized and run, timing every
+phase (best of --repeat). A second, traced run records each phase's peak
+memory and the number of memory blocks it left allocated. Times more than
+--threshold slower than benchmarks/baseline.json, and peaks that much
+larger, are reported as regressions and make the exit status 1. Timings
+only compare on the machine the baseline was saved on, so record a new one
+with --save before relying on it elsewhere.
+
+Usage: python benchmarks/suite.py [--engine ENGINE] [--repeat R]
+       [--scale F] [--threshold T] [--baseline FILE] [--save]
+"""
+
+import gc
+import io
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lox"))
+
+from FastScanner import FastScanner
+from Interpreter import Interpreter
+from Lox import Lox
+from Optimizer import Optimizer
+from Parser import Parser
+from Resolver import Resolver
+
+PHASES = ("scan", "parse", "resolve", "optimize", "interpret")
+
+# Time differences below this are noise, whatever their percentage.
+MIN_TIME_DELTA = 0.002
+
+
+def fib(scale: float) -> str:
+    n = max(10, round(20 + math.log(scale, 1.618)))
+    return f"""
+fun fib(n) {{
+  if (n < 2) return n;
+  return fib(n - 1) + fib(n - 2);
+}}
+print fib({n});
+"""
+
+
+def loops(scale: float) -> str:
+    return f"""
+var sum = 0;
+for (var i = 0; i < {int(50000 * scale)}; i = i + 1) {{
+  sum = sum + i * 2 - i / 3;
+}}
+print sum;
+"""
+
+
+def strings(scale: float) -> str:
+    return f"""
+var s = "";
+for (var i = 0; i < {int(20000 * scale)}; i = i + 1) {{
+  s = s + "x";
+}}
+print s == "";
+"""
+
+
+def classes(scale: float) -> str:
+    return f"""
+class Point {{
+  init(x, y) {{
+    this.x = x;
+    this.y = y;
+  }}
+  add(other) {{
+    return Point(this.x + other.x, this.y + other.y);
+  }}
+}}
+var p = Point(0, 0);
+for (var i = 0; i < {int(20000 * scale)}; i = i + 1) {{
+  p = p.add(Point(1, 2));
+}}
+print p.x + p.y;
+"""
+
+
+def closures(scale: float) -> str:
+    return f"""
+fun counter() {{
+  var count = 0;
+  fun increment() {{
+    count = count + 1;
+    return count;
+  }}
+  return increment;
+}}
+var total = 0;
+for (var i = 0; i < {int(20000 * scale)}; i = i + 1) {{
+  var next = counter();
+  total = total + next() + next();
+}}
+print total;
+"""
+
+
+def scopes(scale: float) -> str:
+    depth = 30
+    opening = "".join(f"{{ var v{d} = {d};\n" for d in range(depth))
+    closing = "}\n" * depth
+    return f"""
+var sum = 0;
+{opening}
+for (var i = 0; i < {int(10000 * scale)}; i = i + 1) {{
+  sum = sum + v0 + v{depth // 2} + v{depth - 1};
+}}
+{closing}
+print sum;
+"""
+
+
+def parsing(scale: float) -> str:
+    function = """
+fun f{0}(a, b) {{
+  var c = a * {0} + b / 2;
+  if (c > 10 and a != b) {{ c = c - 1; }} else {{ c = "text" + "{0}"; }}
+  while (c < 0) c = c + 1;
+  return c;
+}}
+"""
+    return "".join(function.format(i) for i in range(int(1000 * scale)))
+
+
+WORKLOADS = {
+    "fib": fib,
+    "loops": loops,
+    "strings": strings,
+    "classes": classes,
+    "closures": closures,
+    "scopes": scopes,
+    "parse": parsing,
+}
+
+
+def fail(*error):
+    raise RuntimeError("workload failed: " + " ".join(map(str, error)))
+
+
+def phases(source: str, engine: str):
+    """Yields after each phase of running source, naming the phase."""
+    tokens = FastScanner(source, on_error=fail).scan_tokens()
+    yield "scan"
+    statements = Parser(tokens, on_error=fail).parse()
+    yield "parse"
+    interpreter = Interpreter(stdout=io.StringIO(), on_error=fail)
+    Resolver(interpreter=interpreter, on_error=fail).resolve(statements)
+    yield "resolve"
+    statements = Optimizer().optimize(statements)
+    yield "optimize"
+    Lox.runner(interpreter, engine).interpret(statements)
+    yield "interpret"
+
+
+def time_phases(source: str, engine: str, repeat: int):
+    best = dict.fromkeys(PHASES, float("inf"))
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for phase in phases(source, engine):
+            now = time.perf_counter()
+            best[phase] = min(best[phase], now - start)
+            start = now
+    return best
+
+
+def trace_phases(source: str, engine: str):
+    """Returns the peak bytes and the blocks left allocated by each phase."""
+    peaks = dict()
+    blocks = dict()
+    tracemalloc.start()
+    try:
+        gc.collect()
+        before = sys.getallocatedblocks()
+        for phase in phases(source, engine):
+            peaks[phase] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            # Count only what the phase keeps alive, not garbage in cycles.
+            gc.collect()
+            after = sys.getallocatedblocks()
+            blocks[phase] = after - before
+            before = after
+    finally:
+        tracemalloc.stop()
+    return peaks, blocks
+
+
+def compare(results, baseline, threshold: float):
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        for phase in PHASES:
+            new_time, old_time = result["time"][phase], old["time"][phase]
+            if (
+                new_time > old_time * (1 + threshold)
+                and new_time - old_time > MIN_TIME_DELTA
+            ):
+                regressions.append(
+                    f"{name} {phase}: {old_time * 1000:.1f} ms -> "
+                    f"{new_time * 1000:.1f} ms"
+                )
+            new_peak, old_peak = result["peak"][phase], old["peak"][phase]
+            if new_peak > old_peak * (1 + threshold) and new_peak - old_peak > 65536:
+                regressions.append(
+                    f"{name} {phase}: peak {old_peak / 1024:.0f} KB -> "
+                    f"{new_peak / 1024:.0f} KB"
+                )
+    return regressions
+
+
+def main():
+    arg_parser = ArgumentParser(
+        usage="suite.py [--engine ENGINE] [--repeat R] [--scale F] "
+        "[--threshold T] [--baseline FILE] [--save]"
+    )
+    arg_parser.add_argument(
+        "--engine", choices=("tree", "closure", "vm"), default="tree"
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--scale", type=float, default=1.0)
+    arg_parser.add_argument("--threshold", type=float, default=0.2)
+    arg_parser.add_argument(
+        "--baseline", type=Path, default=ROOT / "benchmarks" / "baseline.json"
+    )
+    arg_parser.add_argument(
+        "--save", action="store_true", help="Store the results as the baseline."
+    )
+    args = arg_parser.parse_args()
+
+    print(f"{args.engine} engine, best of {args.repeat}, times in ms")
+    print(
+        f"{'workload':<10}"
+        + "".join(f"{phase:>10}" for phase in PHASES)
+        + f"{'peak KB':>10}{'blocks':>10}"
+    )
+    results = dict()
+    for name, generate in WORKLOADS.items():
+        source = generate(args.scale)
+        times = time_phases(source, args.engine, args.repeat)
+        peaks, blocks = trace_phases(source, args.engine)
+        results[name] = {"time": times, "peak": peaks, "blocks": blocks}
+        print(
+            f"{name:<10}"
+            + "".join(f"{times[phase] * 1000:10.1f}" for phase in PHASES)
+            + f"{max(peaks.values()) / 1024:10.0f}{sum(blocks.values()):10d}"
+        )
+
+    settings = {
+        "engine": args.engine,
+        "scale": args.scale,
+        "python": platform.python_version(),
+    }
+    if args.save:
+        args.baseline.write_text(
+            json.dumps({"settings": settings, "results": results}, indent=2) + "\n"
+        )
+        print(f"saved {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["settings"] != settings:
+        print(f"baseline was recorded with {baseline['settings']}; not comparing")
+        return
+    regressions = compare(results, baseline["results"], args.threshold)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions beyond {args.threshold:.0%} of {args.baseline.name}")
+
+
+if __name__ == "__main__":
+    main()
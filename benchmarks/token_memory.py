@@ -0,0 +1,82 @@
+"""Reports memory per token for the slotted, interned Token against the
+previous representation: a Token with a __dict__ and a fresh string for
+every lexeme.
+
+Usage: python benchmarks/token_memory.py [--size MB]
+"""
+
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lox"))
+
+from FastScanner import FastScanner
+
+
+class DictToken:
+    def __init__(self, type, lexeme, literal, line):
+        self.type = type
+        self.lexeme = lexeme
+        self.literal = literal
+        self.line = line
+
+
+def generate_source(size: int) -> str:
+    sample = "\n".join(
+        path.read_text() for path in sorted((ROOT / "practise_files").glob("*.lox"))
+    )
+    return sample * (size // len(sample) + 1)
+
+
+def copy(value):
+    """Returns value as a fresh object, as an unshared scan would create it.
+
+    Slicing keeps CPython's behaviour for one-character strings, which are
+    cached rather than allocated.
+    """
+    if type(value) is str:
+        return (" " + value)[1:]
+    if type(value) is float:
+        return value + 0.0
+    return value
+
+
+def old_tokens(tokens):
+    # The same stream the old way: every lexeme and literal a new object,
+    # every token an object with a __dict__.
+    return [
+        DictToken(token.type, copy(token.lexeme), copy(token.literal), token.line)
+        for token in tokens
+    ]
+
+
+def traced(build):
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    arg_parser = ArgumentParser(usage="token_memory.py [--size MB]")
+    arg_parser.add_argument("--size", type=float, default=1.0)
+    args = arg_parser.parse_args()
+
+    source = generate_source(int(args.size * 1024 * 1024))
+    # Both layouts are measured by tracemalloc alone, so only what each
+    # actually allocates is counted.
+    tokens, after = traced(lambda: FastScanner(source).scan_tokens())
+    _, before = traced(lambda: old_tokens(tokens))
+
+    count = len(tokens)
+    print(f"{count} tokens from {len(source) / 1024 / 1024:.1f} MB of source")
+    print(f"before  {before / count:6.1f} bytes/token")
+    print(f"after   {after / count:6.1f} bytes/token")
+
+
+if __name__ == "__main__":
+    main()
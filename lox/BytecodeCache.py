@@ -0,0 +1,209 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Optional
+from Chunk import Chunk
+from BytecodeCompiler import COMPILER_VERSION
+from OpCode import OpCode, OPERAND_WIDTHS
+
+MAGIC = b"LOXC"
+FORMAT_VERSION = 2
+
+# Renumbering or adding opcodes, changing their operands or changing what
+# the compiler emits changes the fingerprint, so bytecode written by an
+# older interpreter is never run by a newer one.
+OPCODES_FINGERPRINT = hashlib.sha256(
+    repr(
+        (
+            [(op.name, op.value, OPERAND_WIDTHS.get(op, ())) for op in OpCode],
+            COMPILER_VERSION,
+        )
+    ).encode()
+).digest()[:8]
+
+# magic, format version, opcode fingerprint, optimized, sha256 of the source
+HEADER = struct.Struct("<4sH8s?32s")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+NUMBER = struct.Struct("<d")
+
+NUMBER_TAG = 0
+STRING_TAG = 1
+CHUNK_TAG = 2
+
+
+class BytecodeCache:
+    """Keeps compiled Chunks of a script in __loxcache__ next to it.
+
+    The file starts with a header holding the format version, the opcode
+    fingerprint, the optimizer flag and a hash of the source; any mismatch
+    means the script is compiled again. Files are replaced atomically, so a
+    reader that has one mapped never sees it change underneath.
+    """
+
+    def __init__(self, script: str, optimize: bool) -> None:
+        directory, name = os.path.split(script)
+        self.script = script
+        self.path = os.path.join(directory, "__loxcache__", name + "c")
+        self.optimize = optimize
+
+    def header(self, source: str) -> bytes:
+        digest = hashlib.sha256(source.encode("utf-8")).digest()
+        return HEADER.pack(
+            MAGIC, FORMAT_VERSION, OPCODES_FINGERPRINT, self.optimize, digest
+        )
+
+    def load(self, source: str) -> Optional[Chunk]:
+        try:
+            with open(self.path, "rb") as file, mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as buffer:
+                if buffer[: HEADER.size] != self.header(source):
+                    return None
+                strings, offset = read_strings(buffer, HEADER.size)
+                chunk, _ = read_chunk(buffer, offset, strings)
+                return chunk
+        except (OSError, ValueError, IndexError, struct.error):
+            # Missing, empty or truncated files are just cache misses.
+            return None
+
+    def store(self, source: str, chunk: Chunk):
+        strings = dict()
+        body = bytearray()
+        write_chunk(body, chunk, strings)
+        out = bytearray(self.header(source))
+        write_strings(out, strings)
+        out += body
+
+        directory, name = os.path.split(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # A unique name, so threads and processes storing the same
+            # script never write into each other's file.
+            handle, temporary = tempfile.mkstemp(prefix=name + ".", dir=directory)
+        except OSError:
+            # An unwritable directory only costs the cache.
+            return
+        try:
+            with os.fdopen(handle, "wb") as file:
+                file.write(out)
+            # mkstemp makes the file private. Like __pycache__, give it the
+            # script's permissions instead, so everyone who can read the
+            # script can use the cache.
+            os.chmod(temporary, os.stat(self.script).st_mode & 0o666 | 0o200)
+            os.replace(temporary, self.path)
+        except OSError:
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
+
+
+def write_strings(out: bytearray, strings: dict):
+    # Names, parameters and string constants are stored once, in order of
+    # first use, and referred to by index.
+    out += U32.pack(len(strings))
+    for value in strings:
+        data = value.encode("utf-8")
+        out += U32.pack(len(data))
+        out += data
+
+
+def read_strings(buffer, offset):
+    (count,) = U32.unpack_from(buffer, offset)
+    offset += U32.size
+    strings = []
+    for _ in range(count):
+        (length,) = U32.unpack_from(buffer, offset)
+        offset += U32.size
+        strings.append(sys.intern(str(buffer[offset : offset + length], "utf-8")))
+        offset += length
+    return strings, offset
+
+
+def write_string(out: bytearray, value: str, strings: dict):
+    index = strings.setdefault(value, len(strings))
+    out += U32.pack(index)
+
+
+def read_string(buffer, offset, strings):
+    (index,) = U32.unpack_from(buffer, offset)
+    return strings[index], offset + U32.size
+
+
+def write_array(out: bytearray, values: array):
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values = array(values.typecode, values)
+        values.byteswap()
+    out += U32.pack(len(values))
+    out += values.tobytes()
+
+
+def read_array(buffer, offset, typecode):
+    (length,) = U32.unpack_from(buffer, offset)
+    offset += U32.size
+    values = array(typecode)
+    end = offset + length * values.itemsize
+    values.frombytes(buffer[offset:end])
+    if sys.byteorder == "big" and values.itemsize > 1:
+        values.byteswap()
+    return values, end
+
+
+def write_chunk(out: bytearray, chunk: Chunk, strings: dict):
+    write_string(out, chunk.name, strings)
+    out += U16.pack(len(chunk.params))
+    for param in chunk.params:
+        write_string(out, param, strings)
+    out += U32.pack(chunk.line)
+    write_array(out, chunk.code)
+    write_array(out, chunk.line_offsets)
+    write_array(out, chunk.line_numbers)
+
+    out += U32.pack(len(chunk.constants))
+    for constant in chunk.constants:
+        if isinstance(constant, Chunk):
+            out.append(CHUNK_TAG)
+            write_chunk(out, constant, strings)
+        elif isinstance(constant, str):
+            out.append(STRING_TAG)
+            write_string(out, constant, strings)
+        else:
+            out.append(NUMBER_TAG)
+            out += NUMBER.pack(constant)
+
+
+def read_chunk(buffer, offset, strings):
+    name, offset = read_string(buffer, offset, strings)
+    (count,) = U16.unpack_from(buffer, offset)
+    offset += U16.size
+    params = []
+    for _ in range(count):
+        param, offset = read_string(buffer, offset, strings)
+        params.append(param)
+    (line,) = U32.unpack_from(buffer, offset)
+    offset += U32.size
+
+    chunk = Chunk(name, params, line)
+    chunk.code, offset = read_array(buffer, offset, "B")
+    chunk.line_offsets, offset = read_array(buffer, offset, "I")
+    chunk.line_numbers, offset = read_array(buffer, offset, "I")
+
+    (count,) = U32.unpack_from(buffer, offset)
+    offset += U32.size
+    for _ in range(count):
+        tag = buffer[offset]
+        offset += 1
+        if tag == CHUNK_TAG:
+            constant, offset = read_chunk(buffer, offset, strings)
+        elif tag == STRING_TAG:
+            constant, offset = read_string(buffer, offset, strings)
+        else:
+            (constant,) = NUMBER.unpack_from(buffer, offset)
+            offset += NUMBER.size
+        chunk.constants.append(constant)
+    return chunk, offset
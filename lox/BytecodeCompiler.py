@@ -0,0 +1,249 @@
+from typing import List
+import expressions
+import statements
+from Chunk import Chunk
+from Interpreter import Interpreter
+from OpCode import OpCode, OPERAND_WIDTHS
+from TokenType import TokenType
+
+# Bump whenever the same source compiles to different bytecode, so chunks
+# cached by an older compiler are compiled again.
+COMPILER_VERSION = 2
+
+BINARY_OPCODES = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+
+class BytecodeCompiler(expressions.ExprVisitor, statements.StmtVisitor):
+    """Compiles a resolved syntax tree into Chunks for the VM."""
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        super().__init__()
+        self.interpreter = interpreter
+        self.chunk = None
+        self.line = 0
+
+    def compile(self, statements: List[statements.Stmt]) -> Chunk:
+        self.chunk = Chunk("script", [])
+        for stmt in statements:
+            self.compile_statement(stmt)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+        return self.chunk
+
+    def compile_statement(self, stmt: statements.Stmt):
+        stmt.accept(self)
+
+    def compile_expression(self, expr: expressions.Expr):
+        expr.accept(self)
+
+    def emit(self, op: OpCode, *operands):
+        self.chunk.write(op, self.line)
+        for width, value in zip(OPERAND_WIDTHS.get(op, ()), operands):
+            self.chunk.write_operand(value, width, self.line)
+
+    def emit_jump(self, op: OpCode):
+        self.emit(op, 0)
+        return len(self.chunk.code) - 4
+
+    def patch_jump(self, offset):
+        self.chunk.patch_operand(offset, len(self.chunk.code), 4)
+
+    def name_constant(self, name: str):
+        return self.chunk.add_constant(name)
+
+    def emit_variable(self, expr: expressions.Expr, name: str, local_op, global_op):
+        if expr.depth is None:
+            self.emit(global_op, self.name_constant(name))
+        else:
+            self.emit(local_op, expr.depth, expr.slot)
+
+    def compile_function(self, stmt: statements.Function):
+        enclosing = self.chunk
+        self.chunk = Chunk(
+            stmt.name.lexeme, [param.lexeme for param in stmt.params], stmt.name.line
+        )
+        for statement in stmt.body:
+            self.compile_statement(statement)
+        self.emit(OpCode.NIL)
+        self.emit(OpCode.RETURN)
+        function = self.chunk
+        self.chunk = enclosing
+        self.line = stmt.name.line
+        self.emit(OpCode.FUNCTION, self.chunk.add_constant(function))
+
+    def visit_expression_stmt(self, stmt: statements.Expression):
+        self.compile_expression(stmt.expression)
+        self.emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt: statements.Print):
+        self.compile_expression(stmt.expression)
+        self.emit(OpCode.PRINT)
+
+    def visit_var_stmt(self, stmt: statements.Var):
+        self.line = stmt.name.line
+        if stmt.initializer is None:
+            self.emit(OpCode.NIL)
+        else:
+            self.compile_expression(stmt.initializer)
+        self.emit(OpCode.DEFINE, self.name_constant(stmt.name.lexeme))
+
+    def visit_block_stmt(self, stmt: statements.Block):
+        self.emit(OpCode.PUSH_ENV)
+        for statement in stmt.statements:
+            self.compile_statement(statement)
+        self.emit(OpCode.POP_ENV)
+
+    def visit_if_stmt(self, stmt: statements.If):
+        self.compile_expression(stmt.condition)
+        else_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self.compile_statement(stmt.then_branch)
+        if stmt.else_branch is None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit_jump(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.compile_statement(stmt.else_branch)
+        self.patch_jump(end_jump)
+
+    def visit_while_stmt(self, stmt: statements.While):
+        loop_start = len(self.chunk.code)
+        self.compile_expression(stmt.condition)
+        exit_jump = self.emit_jump(OpCode.POP_JUMP_IF_FALSE)
+        self.compile_statement(stmt.body)
+        self.emit(OpCode.LOOP, loop_start)
+        self.patch_jump(exit_jump)
+
+    def visit_function_stmt(self, stmt: statements.Function):
+        self.compile_function(stmt)
+        self.emit(OpCode.DEFINE, self.name_constant(stmt.name.lexeme))
+
+    def visit_return_stmt(self, stmt: statements.Return):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            self.emit(OpCode.NIL)
+        else:
+            self.compile_expression(stmt.value)
+        self.emit(OpCode.RETURN)
+
+    def visit_class_stmt(self, stmt: statements.Class):
+        self.line = stmt.name.line
+        if stmt.superclass is not None:
+            self.compile_expression(stmt.superclass)
+            self.line = stmt.superclass.name.line
+            self.emit(OpCode.INHERIT)
+        else:
+            self.emit(OpCode.NIL)
+
+        for method in stmt.methods:
+            self.compile_function(method)
+
+        self.line = stmt.name.line
+        self.emit(OpCode.CLASS, self.name_constant(stmt.name.lexeme), len(stmt.methods))
+        if stmt.superclass is not None:
+            self.emit(OpCode.POP_ENV)
+        self.emit(OpCode.DEFINE, self.name_constant(stmt.name.lexeme))
+
+    def visit_literal_expr(self, expr: expressions.Literal):
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT, self.chunk.add_constant(expr.value))
+
+    def visit_grouping_expr(self, expr: expressions.Grouping):
+        self.compile_expression(expr.expression)
+
+    def visit_variable_expr(self, expr: expressions.Variable):
+        self.line = expr.name.line
+        self.emit_variable(expr, expr.name.lexeme, OpCode.GET_LOCAL, OpCode.GET_GLOBAL)
+
+    def visit_this_expr(self, expr: expressions.This):
+        self.line = expr.keyword.line
+        self.emit_variable(expr, "this", OpCode.GET_LOCAL, OpCode.GET_GLOBAL)
+
+    def visit_assign_expr(self, expr: expressions.Assign):
+        self.compile_expression(expr.value)
+        self.line = expr.name.line
+        self.emit_variable(expr, expr.name.lexeme, OpCode.SET_LOCAL, OpCode.SET_GLOBAL)
+
+    def visit_unary_expr(self, expr: expressions.Unary):
+        self.compile_expression(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.type == TokenType.MINUS:
+            self.emit(OpCode.NEGATE)
+        elif expr.operator.type == TokenType.BANG:
+            self.emit(OpCode.NOT)
+        else:
+            self.emit(OpCode.POP)
+            self.emit(OpCode.NIL)
+
+    def visit_binary_expr(self, expr: expressions.Binary):
+        self.compile_expression(expr.left)
+        self.compile_expression(expr.right)
+        self.line = expr.operator.line
+        op = BINARY_OPCODES.get(expr.operator.type)
+        if op is None:
+            self.emit(OpCode.POP)
+            self.emit(OpCode.POP)
+            self.emit(OpCode.NIL)
+        else:
+            self.emit(op)
+
+    def visit_logical_expr(self, expr: expressions.Logical):
+        self.compile_expression(expr.left)
+        if expr.operator.type == TokenType.OR:
+            end_jump = self.emit_jump(OpCode.JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(OpCode.JUMP_IF_FALSE)
+        self.emit(OpCode.POP)
+        self.compile_expression(expr.right)
+        self.patch_jump(end_jump)
+
+    def visit_call_expr(self, expr: expressions.Call):
+        if type(expr.callee) is expressions.Get:
+            # Look the method up and call it in one step, without binding it.
+            get = expr.callee
+            self.compile_expression(get.obj)
+            for argument in expr.arguments:
+                self.compile_expression(argument)
+            self.line = expr.paren.line
+            self.emit(
+                OpCode.INVOKE, self.name_constant(get.name.lexeme), len(expr.arguments)
+            )
+            return
+
+        self.compile_expression(expr.callee)
+        for argument in expr.arguments:
+            self.compile_expression(argument)
+        self.line = expr.paren.line
+        self.emit(OpCode.CALL, len(expr.arguments))
+
+    def visit_get_expr(self, expr: expressions.Get):
+        self.compile_expression(expr.obj)
+        self.line = expr.name.line
+        self.emit(OpCode.GET_PROPERTY, self.name_constant(expr.name.lexeme))
+
+    def visit_set_expr(self, expr: expressions.Set):
+        self.compile_expression(expr.obj)
+        self.compile_expression(expr.value)
+        self.line = expr.name.line
+        self.emit(OpCode.SET_PROPERTY, self.name_constant(expr.name.lexeme))
+
+    def visit_super_expr(self, expr: expressions.Super):
+        self.line = expr.method.line
+        self.emit(OpCode.GET_SUPER, self.name_constant(expr.method.lexeme), expr.depth)
@@ -0,0 +1,92 @@
+import struct
+from array import array
+from bisect import bisect_right
+from typing import List
+from OpCode import OpCode, OPERAND_WIDTHS
+
+FLOAT = struct.Struct("<d")
+
+
+class Chunk:
+    """Bytecode for one function body (or the top-level script).
+
+    Instructions are single bytes followed by big-endian operands, constants
+    live in a per-chunk pool and source lines are run-length encoded as
+    (offset, line) pairs.
+    """
+
+    def __init__(self, name: str, params: List[str], line=0) -> None:
+        self.name = name
+        self.params = params
+        # Line of the function's declaration, 0 for the script.
+        self.line = line
+        self.code = array("B")
+        self.constants = list()
+        self.constant_index = dict()
+        self.line_offsets = array("I")
+        self.line_numbers = array("I")
+
+    def arity(self):
+        return len(self.params)
+
+    def write(self, byte, line):
+        if len(self.line_numbers) == 0 or self.line_numbers[-1] != line:
+            self.line_offsets.append(len(self.code))
+            self.line_numbers.append(line)
+        self.code.append(byte)
+
+    def write_operand(self, value, width, line):
+        for shift in range((width - 1) * 8, -1, -8):
+            self.write((value >> shift) & 0xFF, line)
+
+    def patch_operand(self, offset, value, width):
+        for idx, shift in enumerate(range((width - 1) * 8, -1, -8)):
+            self.code[offset + idx] = (value >> shift) & 0xFF
+
+    def add_constant(self, value):
+        # Floats and bools compare equal (1.0 == True), so key on the type
+        # too. Floats are keyed by their bits, as -0.0 == 0.0.
+        if isinstance(value, Chunk):
+            key = id(value)
+        elif type(value) is float:
+            key = (float, FLOAT.pack(value))
+        else:
+            key = (type(value), value)
+        index = self.constant_index.get(key)
+        if index is None:
+            index = len(self.constants)
+            if index > 0xFFFF:
+                raise OverflowError("Too many constants in one chunk.")
+            self.constants.append(value)
+            self.constant_index[key] = index
+        return index
+
+    def line_at(self, offset):
+        idx = bisect_right(self.line_offsets, offset) - 1
+        return self.line_numbers[idx] if idx >= 0 else 0
+
+    def disassemble(self):
+        lines = [f"== {self.name} =="]
+        offset = 0
+        while offset < len(self.code):
+            op = OpCode(self.code[offset])
+            operands = []
+            cursor = offset + 1
+            for width in OPERAND_WIDTHS.get(op, ()):
+                value = int.from_bytes(self.code[cursor : cursor + width], "big")
+                operands.append(value)
+                cursor += width
+            text = f"{offset:06d} {self.line_at(offset):4d} {op.name:<18}"
+            text += " ".join(str(operand) for operand in operands)
+            if op in (OpCode.CONSTANT, OpCode.FUNCTION):
+                text += f"  ({self.constants[operands[0]]!r})"
+            lines.append(text)
+            offset = cursor
+
+        for constant in self.constants:
+            if isinstance(constant, Chunk):
+                lines.append(constant.disassemble())
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return "<chunk " + self.name + ">"
@@ -0,0 +1,538 @@
+import operator as py_operator
+from typing import List
+import expressions
+import statements
+from TokenType import TokenType
+from Environment import Environment
+from Interpreter import Interpreter
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from LoxReturn import RETURN
+from LoxRuntimeError import LoxRuntimeError
+from operators import is_truthy, is_equal
+from Rope import STRING_TYPES, concatenate
+
+# Comparison and arithmetic operators which require two number operands.
+NUMERIC_OPERATORS = {
+    TokenType.MINUS: py_operator.sub,
+    TokenType.SLASH: py_operator.truediv,
+    TokenType.STAR: py_operator.mul,
+    TokenType.GREATER: py_operator.gt,
+    TokenType.GREATER_EQUAL: py_operator.ge,
+    TokenType.LESS: py_operator.lt,
+    TokenType.LESS_EQUAL: py_operator.le,
+}
+
+
+class CompiledFunction(LoxCallable):
+    def __init__(
+        self,
+        declaration: statements.Function,
+        body,
+        closure: Environment,
+        is_initializer: bool,
+        instance=None,
+    ) -> None:
+        super().__init__()
+        self.declaration = declaration
+        self.body = body
+        self.closure = closure
+        self.is_initializer = is_initializer
+        self.instance = instance
+        self.params_count = len(declaration.params)
+
+    def call(self, interpreter, arguments):
+        if self.instance is not None:
+            arguments = [self.instance] + arguments
+        return self.execute(Environment(self.closure, arguments))
+
+    def invoke(self, interpreter, instance, arguments):
+        arguments.insert(0, instance)
+        return self.execute(Environment(self.closure, arguments))
+
+    def execute(self, environment: Environment):
+        result = self.body(environment)
+        if self.is_initializer:
+            return environment.values[0]
+        return result
+
+    def arity(self):
+        return self.params_count
+
+    def __str__(self) -> str:
+        return "<fn " + self.declaration.name.lexeme + ">"
+
+    def bind(self, instance):
+        return CompiledFunction(
+            self.declaration, self.body, self.closure, self.is_initializer, instance
+        )
+
+
+class ClosureCompiler(expressions.ExprVisitor, statements.StmtVisitor):
+    """Turns a resolved syntax tree into a tree of Python closures.
+
+    Every closure takes the current Environment as its only argument, so
+    variable depths, operators and constants are looked up once here
+    instead of on every evaluation.
+    """
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        super().__init__()
+        self.interpreter = interpreter
+        self.return_value = None
+
+    def compile(self, statements: List[statements.Stmt]):
+        return [self.compile_statement(stmt) for stmt in statements]
+
+    def compile_statement(self, stmt: statements.Stmt):
+        return stmt.accept(self)
+
+    def compile_expression(self, expr: expressions.Expr):
+        return expr.accept(self)
+
+    def interpret(self, statements: List[statements.Stmt]):
+        program = self.compile(statements)
+        environment = self.interpreter.globals
+        try:
+            for stmt in program:
+                stmt(environment)
+        except LoxRuntimeError as loxe:
+            self.interpreter.runtime_error(loxe)
+        except RecursionError:
+            self.interpreter.runtime_error(self.interpreter.stack_overflow())
+
+    def lookup(self, expr: expressions.Expr, name):
+        if expr.depth is None:
+            globals = self.interpreter.globals
+            return lambda env: globals.get(name)
+
+        distance, slot = expr.depth, expr.slot
+        if distance == 0:
+            return lambda env: env.values[slot]
+        if distance == 1:
+            return lambda env: env.enclosing.values[slot]
+        if distance == 2:
+            return lambda env: env.enclosing.enclosing.values[slot]
+        return lambda env: env.ancestor(distance).values[slot]
+
+    def visit_expression_stmt(self, stmt: statements.Expression):
+        return self.compile_expression(stmt.expression)
+
+    def visit_print_stmt(self, stmt: statements.Print):
+        expression = self.compile_expression(stmt.expression)
+        stringify = self.interpreter.stringify
+        stdout = self.interpreter.stdout
+
+        def print_stmt(env):
+            print(stringify(expression(env)), file=stdout)
+
+        return print_stmt
+
+    def visit_var_stmt(self, stmt: statements.Var):
+        name = stmt.name.lexeme
+        if stmt.initializer is None:
+
+            def var_stmt(env):
+                env.define(name, None)
+
+            return var_stmt
+
+        initializer = self.compile_expression(stmt.initializer)
+
+        def var_stmt(env):
+            env.define(name, initializer(env))
+
+        return var_stmt
+
+    def visit_block_stmt(self, stmt: statements.Block):
+        body = self.compile(stmt.statements)
+
+        def block_stmt(env):
+            environment = Environment(env)
+            for statement in body:
+                if statement(environment) is RETURN:
+                    return RETURN
+
+        return block_stmt
+
+    def visit_if_stmt(self, stmt: statements.If):
+        condition = self.compile_expression(stmt.condition)
+        then_branch = self.compile_statement(stmt.then_branch)
+        if stmt.else_branch is None:
+
+            def if_stmt(env):
+                value = condition(env)
+                if value is not None and value is not False:
+                    return then_branch(env)
+
+            return if_stmt
+
+        else_branch = self.compile_statement(stmt.else_branch)
+
+        def if_else_stmt(env):
+            value = condition(env)
+            if value is not None and value is not False:
+                return then_branch(env)
+            return else_branch(env)
+
+        return if_else_stmt
+
+    def visit_while_stmt(self, stmt: statements.While):
+        condition = self.compile_expression(stmt.condition)
+        body = self.compile_statement(stmt.body)
+
+        def while_stmt(env):
+            value = condition(env)
+            while value is not None and value is not False:
+                if body(env) is RETURN:
+                    return RETURN
+                value = condition(env)
+
+        return while_stmt
+
+    def compile_function(self, stmt: statements.Function):
+        """Compiles a function body into one closure returning its result.
+
+        A trailing 'return' is evaluated directly instead of signalling
+        RETURN, so a body that is a single 'return' compiles down to its
+        expression.
+        """
+        body = stmt.body
+        result = lambda env: None
+        if body and type(body[-1]) is statements.Return:
+            if body[-1].value is not None:
+                result = self.compile_expression(body[-1].value)
+            body = body[:-1]
+        body = self.compile(body)
+        if not body:
+            return result
+
+        compiler = self
+
+        def function_body(env):
+            for statement in body:
+                if statement(env) is RETURN:
+                    return compiler.return_value
+            return result(env)
+
+        return function_body
+
+    def visit_function_stmt(self, stmt: statements.Function):
+        name = stmt.name.lexeme
+        body = self.compile_function(stmt)
+
+        def function_stmt(env):
+            env.define(name, CompiledFunction(stmt, body, env, False))
+
+        return function_stmt
+
+    def visit_return_stmt(self, stmt: statements.Return):
+        compiler = self
+        if stmt.value is None:
+
+            def return_stmt(env):
+                compiler.return_value = None
+                return RETURN
+
+            return return_stmt
+
+        value = self.compile_expression(stmt.value)
+
+        def return_value_stmt(env):
+            compiler.return_value = value(env)
+            return RETURN
+
+        return return_value_stmt
+
+    def visit_class_stmt(self, stmt: statements.Class):
+        name = stmt.name.lexeme
+        superclass_expr = None
+        if stmt.superclass is not None:
+            superclass_expr = self.compile_expression(stmt.superclass)
+        methods = [
+            (method, self.compile_function(method), method.name.lexeme == "init")
+            for method in stmt.methods
+        ]
+
+        def class_stmt(env):
+            superclass = None
+            if superclass_expr is not None:
+                superclass = superclass_expr(env)
+                if not isinstance(superclass, LoxClass):
+                    raise LoxRuntimeError(
+                        stmt.superclass.name, "Superclass must be a class."
+                    )
+
+            closure = env
+            if superclass is not None:
+                closure = Environment(env, [superclass])
+
+            functions = dict()
+            for method, body, is_initializer in methods:
+                functions[method.name.lexeme] = CompiledFunction(
+                    method, body, closure, is_initializer
+                )
+
+            klass = LoxClass(name, methods=functions, superclass=superclass)
+            env.define(name, klass)
+
+        return class_stmt
+
+    def visit_literal_expr(self, expr: expressions.Literal):
+        value = expr.value
+        return lambda env: value
+
+    def visit_grouping_expr(self, expr: expressions.Grouping):
+        return self.compile_expression(expr.expression)
+
+    def visit_variable_expr(self, expr: expressions.Variable):
+        return self.lookup(expr, expr.name)
+
+    def visit_this_expr(self, expr: expressions.This):
+        return self.lookup(expr, expr.keyword)
+
+    def visit_assign_expr(self, expr: expressions.Assign):
+        value = self.compile_expression(expr.value)
+        name = expr.name
+        if expr.depth is None:
+            globals = self.interpreter.globals
+
+            def assign_global(env):
+                result = value(env)
+                globals.assign(name, result)
+                return result
+
+            return assign_global
+
+        distance, slot = expr.depth, expr.slot
+
+        def assign_local(env):
+            result = value(env)
+            env.ancestor(distance).values[slot] = result
+            return result
+
+        return assign_local
+
+    def visit_unary_expr(self, expr: expressions.Unary):
+        right = self.compile_expression(expr.right)
+        operator = expr.operator
+
+        if operator.type == TokenType.MINUS:
+
+            def negate(env):
+                value = right(env)
+                if type(value) is float:
+                    return -value
+                raise LoxRuntimeError(operator, "Operand must be a number.")
+
+            return negate
+
+        if operator.type == TokenType.BANG:
+            return lambda env: not is_truthy(right(env))
+
+        return lambda env: None
+
+    def visit_binary_expr(self, expr: expressions.Binary):
+        left = self.compile_expression(expr.left)
+        right = self.compile_expression(expr.right)
+        operator = expr.operator
+
+        if operator.type in NUMERIC_OPERATORS:
+            op = NUMERIC_OPERATORS[operator.type]
+            if isinstance(expr.right, expressions.Literal) and (
+                type(expr.right.value) is float
+            ):
+                constant = expr.right.value
+
+                def numeric_constant(env):
+                    a = left(env)
+                    if type(a) is float:
+                        try:
+                            return op(a, constant)
+                        except ZeroDivisionError:
+                            raise LoxRuntimeError(
+                                operator, "Division by zero."
+                            ) from None
+                    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+                return numeric_constant
+
+            def numeric(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is float and type(b) is float:
+                    try:
+                        return op(a, b)
+                    except ZeroDivisionError:
+                        raise LoxRuntimeError(operator, "Division by zero.") from None
+                raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+            return numeric
+
+        if operator.type == TokenType.PLUS:
+
+            def add(env):
+                a = left(env)
+                b = right(env)
+                if type(a) is float and type(b) is float:
+                    return a + b
+                if type(a) in STRING_TYPES and type(b) in STRING_TYPES:
+                    return concatenate(a, b)
+                raise LoxRuntimeError(
+                    operator, "Operands must be two numbers or two strings."
+                )
+
+            return add
+
+        if operator.type == TokenType.EQUAL_EQUAL:
+            return lambda env: is_equal(left(env), right(env))
+
+        if operator.type == TokenType.BANG_EQUAL:
+            return lambda env: not is_equal(left(env), right(env))
+
+        def unknown(env):
+            left(env)
+            right(env)
+            return None
+
+        return unknown
+
+    def visit_logical_expr(self, expr: expressions.Logical):
+        left = self.compile_expression(expr.left)
+        right = self.compile_expression(expr.right)
+
+        if expr.operator.type == TokenType.OR:
+
+            def logical_or(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+
+        return logical_and
+
+    def visit_call_expr(self, expr: expressions.Call):
+        if type(expr.callee) is expressions.Get:
+            return self.compile_method_call(expr, expr.callee)
+
+        callee = self.compile_expression(expr.callee)
+        arguments = [self.compile_expression(arg) for arg in expr.arguments]
+        call_value = self.compile_call_value(expr)
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call(env):
+            function = callee(env)
+            values = [argument(env) for argument in arguments]
+            try:
+                if (
+                    type(function) is CompiledFunction
+                    and function.instance is None
+                    and len(values) == function.params_count
+                ):
+                    return function.execute(Environment(function.closure, values))
+                return call_value(function, values)
+            except RecursionError:
+                raise interpreter.stack_overflow(paren) from None
+
+        return call
+
+    def compile_call_value(self, expr: expressions.Call):
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call_value(function, values):
+            if not isinstance(function, LoxCallable):
+                raise LoxRuntimeError(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise interpreter.arity_error(paren, function.arity(), len(values))
+            return function.call(interpreter, values)
+
+        return call_value
+
+    def compile_method_call(self, expr: expressions.Call, get: expressions.Get):
+        obj = self.compile_expression(get.obj)
+        arguments = [self.compile_expression(arg) for arg in expr.arguments]
+        call_value = self.compile_call_value(expr)
+        name = get.name
+        lexeme = name.lexeme
+        cache = get.cache
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def method_call(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxInstance):
+                raise LoxRuntimeError(name, "Only instances have properties.")
+
+            try:
+                if lexeme in instance.fields:
+                    values = [argument(env) for argument in arguments]
+                    return call_value(instance.fields[lexeme], values)
+
+                method = cache.lookup(instance.klass, lexeme)
+                if method is None:
+                    raise LoxRuntimeError(name, "Undefined property '" + lexeme + "'.")
+
+                values = [argument(env) for argument in arguments]
+                if len(values) != method.arity():
+                    raise interpreter.arity_error(paren, method.arity(), len(values))
+
+                return method.invoke(interpreter, instance, values)
+            except RecursionError:
+                raise interpreter.stack_overflow(paren) from None
+
+        return method_call
+
+    def visit_get_expr(self, expr: expressions.Get):
+        obj = self.compile_expression(expr.obj)
+        name = expr.name
+        cache = expr.cache
+
+        def get(env):
+            instance = obj(env)
+            if isinstance(instance, LoxInstance):
+                return instance.get(name, cache)
+            raise LoxRuntimeError(name, "Only instances have properties.")
+
+        return get
+
+    def visit_set_expr(self, expr: expressions.Set):
+        obj = self.compile_expression(expr.obj)
+        value = self.compile_expression(expr.value)
+        name = expr.name
+
+        def set(env):
+            instance = obj(env)
+            if not isinstance(instance, LoxInstance):
+                raise LoxRuntimeError(name, "Only instances have fields.")
+            result = value(env)
+            instance.set(name, result)
+            return result
+
+        return set
+
+    def visit_super_expr(self, expr: expressions.Super):
+        distance, slot = expr.depth, expr.slot
+        method_name = expr.method
+
+        def super_expr(env):
+            superclass = env.get_at(distance, slot)
+            obj = env.get_at(distance - 1, 0)
+            method = superclass.find_method(method_name.lexeme)
+            if method is None:
+                raise LoxRuntimeError(
+                    method_name, "Undefined property '" + method_name.lexeme + "'."
+                )
+            return method.bind(obj)
+
+        return super_expr
@@ -1,41 +1,52 @@
-from typing import Dict, Optional
+from typing import List, Optional
+from LoxRuntimeError import LoxRuntimeError
 from Token import Token
 
 
-class EnvironmentError(RuntimeError):
-    def __init__(self, token, message):
-        super().__init__(message)
-        self.token = token
+class EnvironmentError(LoxRuntimeError):
+    pass
 
 
-class Environment:
-    def __init__(self, enclosing=None):
+class GlobalEnvironment:
+    __slots__ = ("values",)
+
+    def __init__(self):
         self.values = dict()
-        self.enclosing = enclosing
 
     def define(self, name, value):
         self.values[name] = value
 
     def get(self, name: Token):
-        if name.lexeme in self.values.keys():
+        if name.lexeme in self.values:
             return self.values[name.lexeme]
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-
         raise EnvironmentError(name, "Undefined variable '" + name.lexeme + "'.")
 
     def assign(self, name: Token, value):
-        if name.lexeme in self.values.keys():
+        if name.lexeme in self.values:
             self.values[name.lexeme] = value
             return
 
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-
         raise EnvironmentError(name, "Undefined variable '" + name.lexeme + "'.")
 
+
+class Environment:
+    """A local scope whose variables live in a list.
+
+    The Resolver gives every local a (depth, slot) pair, where the slot is the
+    order of declaration within its scope, so defining a variable is an append
+    and reading one is an index.
+    """
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, enclosing=None, values: Optional[List] = None):
+        self.values = [] if values is None else values
+        self.enclosing = enclosing
+
+    def define(self, name, value):
+        self.values.append(value)
+
     def ancestor(self, distance):
         environment = self
         for _ in range(distance):
@@ -43,8 +54,8 @@ class Environment:
 
         return environment
 
-    def get_at(self, distance, name):
-        return self.ancestor(distance).values.get(name)
+    def get_at(self, distance, slot):
+        return self.ancestor(distance).values[slot]
 
-    def assign_at(self, distance, name, value):
-        self.ancestor(distance=distance).values[name.lexeme] = value
+    def assign_at(self, distance, slot, value):
+        self.ancestor(distance).values[slot] = value
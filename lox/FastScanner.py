@@ -0,0 +1,123 @@
+import re
+from sys import intern
+from Token import Token
+from TokenType import TokenType
+
+KEYWORDS = {
+    "and": TokenType.AND,
+    "class": TokenType.CLASS,
+    "else": TokenType.ELSE,
+    "false": TokenType.FALSE,
+    "for": TokenType.FOR,
+    "fun": TokenType.FUN,
+    "if": TokenType.IF,
+    "nil": TokenType.NIL,
+    "or": TokenType.OR,
+    "print": TokenType.PRINT,
+    "return": TokenType.RETURN,
+    "super": TokenType.SUPER,
+    "this": TokenType.THIS,
+    "true": TokenType.TRUE,
+    "var": TokenType.VAR,
+    "while": TokenType.WHILE,
+}
+
+PUNCTUATION = {
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+    "-": TokenType.MINUS,
+    "+": TokenType.PLUS,
+    ";": TokenType.SEMICOLON,
+    "/": TokenType.SLASH,
+    "*": TokenType.STAR,
+    "!": TokenType.BANG,
+    "!=": TokenType.BANG_EQUAL,
+    "=": TokenType.EQUAL,
+    "==": TokenType.EQUAL_EQUAL,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+}
+
+# Keywords, operators and punctuation map straight to their TokenType; any
+# other word is an identifier.
+TOKEN_TYPES = {**KEYWORDS, **PUNCTUATION}
+
+# Each match skips leading spaces and then takes one lexeme. Comments come
+# before '/', and two character operators before their one character prefix.
+TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t\r]*
+    (?:
+        (?P<comment>//[^\n]*)
+      | (?P<word>[A-Za-z_][A-Za-z_0-9]*|[!=<>]=?|[(){},.\-+;/*])
+      | (?P<newline>\n[ \t\r\n]*)
+      | (?P<number>[0-9]+(?:\.[0-9]+)?)
+      | (?P<string>"[^"]*")
+      | (?P<unterminated>"[^"]*)
+      | (?P<unexpected>[^ \t\r\n])
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+class FastScanner:
+    """Produces the same tokens as Scanner using one compiled regex.
+
+    Each match of TOKEN_PATTERN is one lexeme, so the per-character method
+    calls of Scanner are replaced by a single loop over the matches and
+    dictionary lookups for keywords and operators.
+    """
+
+    def __init__(self, source, on_error=None):
+        self.source = source
+        self.tokens = list()
+        self.line = 1
+        self.on_error = on_error
+
+    def scan_tokens(self):
+        self.tokens.extend(self.tokens_from(TOKEN_PATTERN.finditer(self.source)))
+        self.tokens.append(Token(TokenType.EOF, "", None, self.line))
+        return self.tokens
+
+    def tokens_from(self, matches):
+        """Yields the Tokens for the given TOKEN_PATTERN matches."""
+        line = self.line
+        types = TOKEN_TYPES
+        IDENTIFIER = TokenType.IDENTIFIER
+
+        for match in matches:
+            kind = match.lastgroup
+            if kind == "word":
+                # Interned, every occurrence of a name shares one string and
+                # dictionary lookups on it compare by identity.
+                text = intern(match.group(kind))
+                yield Token(types.get(text, IDENTIFIER), text, None, line)
+            elif kind == "newline":
+                line += match.group(kind).count("\n")
+            elif kind == "number":
+                text = match.group(kind)
+                yield Token(TokenType.NUMBER, text, float(text), line)
+            elif kind == "string":
+                text = match.group(kind)
+                line += text.count("\n")
+                yield Token(TokenType.STRING, text, text[1:-1], line)
+            elif kind == "unterminated":
+                line += match.group(kind).count("\n")
+                self.error(line, "Unterminated string.")
+            elif kind == "unexpected":
+                self.error(line, "Unexpected character.")
+
+        self.line = line
+
+    def error(self, line, message):
+        if self.on_error is None:
+            print(line, message)
+        else:
+            self.on_error(line, message)
@@ -0,0 +1,40 @@
+class InlineCache:
+    """Caches method lookups at one property-access site.
+
+    The first receiver class seen is kept as a monomorphic (class, method)
+    entry; up to MAX_ENTRIES further classes go into a small polymorphic
+    table, after which the site stops caching and asks the class directly.
+    Classes never change after creation, so entries never go stale. The
+    monomorphic entry is a single tuple so concurrent readers never see a
+    class paired with another class's method.
+    """
+
+    __slots__ = ("entry", "polymorphic")
+
+    MAX_ENTRIES = 4
+
+    def __init__(self) -> None:
+        self.entry = (None, None)
+        self.polymorphic = None
+
+    def lookup(self, klass, name):
+        entry = self.entry
+        if entry[0] is klass:
+            return entry[1]
+
+        polymorphic = self.polymorphic
+        if polymorphic is not None and klass in polymorphic:
+            return polymorphic[klass]
+
+        method = klass.find_method(name)
+        if entry[0] is None:
+            self.entry = (klass, method)
+        elif polymorphic is None:
+            self.polymorphic = {klass: method}
+        elif len(polymorphic) < self.MAX_ENTRIES:
+            polymorphic[klass] = method
+        return method
+
+    def clear(self):
+        self.entry = (None, None)
+        self.polymorphic = None
@@ -0,0 +1,114 @@
+import json
+from collections import Counter, defaultdict
+from typing import List
+import expressions
+import statements
+from Environment import Environment
+from Interpreter import Interpreter
+from LoxInstance import LoxInstance
+from LoxRuntimeError import LoxRuntimeError
+from Token import Token
+
+# Fields through which a node refers to its token, then the fields of the
+# child expressions whose line it shares.
+TOKEN_FIELDS = ("name", "operator", "paren", "keyword", "method")
+CHILD_FIELDS = ("expression", "condition", "left", "callee", "obj", "value")
+
+OPERATOR_NODES = (expressions.Binary, expressions.Logical, expressions.Unary)
+
+
+def node_line(node):
+    for field in TOKEN_FIELDS:
+        token = getattr(node, field, None)
+        if type(token) is Token:
+            return token.line
+    for field in CHILD_FIELDS:
+        child = getattr(node, field, None)
+        if isinstance(child, (expressions.Expr, statements.Stmt)):
+            return node_line(child)
+    return None
+
+
+class Counters:
+    """What an InstrumentedInterpreter saw, ready to be dumped as JSON."""
+
+    def __init__(self) -> None:
+        # Executions of each node, keyed by the node itself.
+        self.executions = defaultdict(int)
+        self.environments = 0
+        self.binds = 0
+
+    def as_dict(self):
+        nodes = Counter()
+        sites = Counter()
+        operators = Counter()
+        for node, count in self.executions.items():
+            name = type(node).__name__
+            nodes[name] += count
+            line = node_line(node)
+            sites[name if line is None else name + " line " + str(line)] += count
+            if isinstance(node, OPERATOR_NODES):
+                operators[node.operator.type.name] += count
+
+        return {
+            "nodes": dict(nodes.most_common()),
+            "sites": dict(sites.most_common()),
+            "operators": dict(operators.most_common()),
+            "environments": self.environments,
+            "binds": self.binds,
+            "returns": nodes["Return"],
+        }
+
+    def dump(self, file):
+        json.dump(self.as_dict(), file, indent=2)
+        file.write("\n")
+
+
+class InstrumentedInterpreter(Interpreter):
+    """An Interpreter that counts what it does into a Counters.
+
+    The counting lives in these overrides rather than in Interpreter, so an
+    uninstrumented run executes exactly the same code as before. Every node
+    is counted as it is executed or evaluated, which also gives the
+    operators of binary, logical and unary expressions. Each Environment
+    reaches execute_block, apart from the one holding 'super'.
+    """
+
+    def __init__(self, counters: Counters, stdout=None, on_error=None) -> None:
+        super().__init__(stdout, on_error)
+        self.counters = counters
+        self.executions = counters.executions
+
+    def evaluate(self, expr: expressions.Expr):
+        self.executions[expr] += 1
+        return expr.accept(self)
+
+    def execute(self, stmt: statements.Stmt):
+        self.executions[stmt] += 1
+        return stmt.accept(self)
+
+    def execute_block(
+        self, statements: List[statements.Stmt], environment: Environment
+    ):
+        self.counters.environments += 1
+        return super().execute_block(statements, environment)
+
+    def visit_class_stmt(self, stmt: statements.Class):
+        if stmt.superclass is not None:
+            self.counters.environments += 1
+        return super().visit_class_stmt(stmt)
+
+    def visit_get_expr(self, expr: expressions.Get):
+        # Mirrors Interpreter.visit_get_expr: reading a method rather than a
+        # field binds it to the instance.
+        object = self.evaluate(expr=expr.obj)
+        if isinstance(object, LoxInstance):
+            if expr.name.lexeme not in object.fields:
+                self.counters.binds += 1
+            return object.get(expr.name, expr.cache)
+
+        raise LoxRuntimeError(expr.name, "Only instances have properties.")
+
+    def visit_super_expr(self, expr: expressions.Super):
+        self.counters.binds += 1
+        return super().visit_super_expr(expr)
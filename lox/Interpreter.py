@@ -1,34 +1,38 @@
-from typing import List
+from typing import List, Optional
 import expressions
 from TokenType import TokenType
 from Token import Token
 import statements
-from Environment import Environment
+from Environment import Environment, GlobalEnvironment
 from LoxCallable import LoxCallable
 from LoxClock import Clock
 from LoxFunction import LoxFunction
-from LoxReturn import ReturnException
+from LoxReturn import RETURN
 from LoxClass import LoxClass
 from LoxInstance import LoxInstance
 from LoxRuntimeError import LoxRuntimeError
 
 
 class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
-    def __init__(self) -> None:
+    def __init__(self, stdout=None, on_error=None) -> None:
         super().__init__()
-        self.globals = Environment()
+        self.globals = GlobalEnvironment()
         self.environment = self.globals
         self.globals.define("clock", Clock())
-        self.locals = dict()
+        self.return_value = None
+        # Where print statements write; None means sys.stdout.
+        self.stdout = stdout
+        self.on_error = on_error
 
     def evaluate(self, expr: expressions.Expr):
         return expr.accept(self)
 
     def execute(self, stmt: statements.Stmt):
-        stmt.accept(self)
+        return stmt.accept(self)
 
-    def resolve(self, expr, depth):
-        self.locals[expr] = depth
+    def resolve(self, expr, depth, slot):
+        expr.depth = depth
+        expr.slot = slot
 
     def is_truthy(self, obj):
         if obj is None:
@@ -44,32 +48,32 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                if self.execute(statement) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous
 
     def lookup_variable(self, name: Token, expr: expressions.Expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
+        if expr.depth is not None:
+            return self.environment.get_at(expr.depth, expr.slot)
         else:
             return self.globals.get(name)
 
     def visit_if_stmt(self, stmt: statements.If):
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
+            return self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.else_branch)
 
     def visit_block_stmt(self, stmt: statements.Block):
-        self.execute_block(stmt.statements, Environment(self.environment))
+        return self.execute_block(stmt.statements, Environment(self.environment))
 
     def visit_expression_stmt(self, expr: statements.Expression):
         self.evaluate(expr.expression)
 
     def visit_print_stmt(self, stmt: statements.Print):
         value = self.evaluate(stmt.expression)
-        print(self.stringify(value))
+        print(self.stringify(value), file=self.stdout)
         return None
 
     def visit_var_stmt(self, stmt: statements.Var):
@@ -87,11 +91,6 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
             return
         raise LoxRuntimeError(operator, "Operand must be a number.")
 
-    def check_number_operands(self, operator, left, right):
-        if type(left) == float and type(right) == float:
-            return
-        raise LoxRuntimeError(operator, "Operands must be numbers.")
-
     def visit_literal_expr(self, expr):
         return expr.value
 
@@ -109,63 +108,10 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
 
         return None
 
-    def is_equal(self, a, b):
-        if a is None and b is None:
-            return True
-        if a is None:
-            return False
-        return a == b
-
     def visit_binary_expr(self, expr: expressions.Binary):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
-
-        if expr.operator.type == TokenType.MINUS:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) - (float(right))
-
-        if expr.operator.type == TokenType.SLASH:
-            return (float(left)) / (float(right))
-
-        if expr.operator.type == TokenType.STAR:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) * (float(right))
-
-        if expr.operator.type == TokenType.PLUS:
-
-            if type(left) == float and type(right) == float:
-                return float(left) + float(right)
-
-            if type(left) == str and type(right) == str:
-                return str(left) + str(right)
-
-            raise LoxRuntimeError(
-                expr.operator, "Operands must be two numbers or two strings."
-            )
-
-        if expr.operator.type == TokenType.GREATER:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) > (float(right))
-
-        if expr.operator.type == TokenType.GREATER_EQUAL:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) >= (float(right))
-
-        if expr.operator.type == TokenType.LESS:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) < (float(right))
-
-        if expr.operator.type == TokenType.LESS_EQUAL:
-            self.check_number_operands(expr.operator, left, right)
-            return (float(left)) <= (float(right))
-
-        if expr.operator.type == TokenType.BANG_EQUAL:
-            return not self.is_equal(left, right)
-
-        if expr.operator.type == TokenType.EQUAL_EQUAL:
-            return self.is_equal(left, right)
-
-        return None
+        return expr.handler(expr.operator, left, right)
 
     def visit_function_stmt(self, stmt: statements.Stmt):
         function = LoxFunction(stmt, self.environment, False)
@@ -176,7 +122,15 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
             for stmt in statements:
                 self.execute(stmt)
         except LoxRuntimeError as loxe:
-            print(loxe)
+            self.runtime_error(loxe)
+        except RecursionError:
+            self.runtime_error(self.stack_overflow())
+
+    def runtime_error(self, error: LoxRuntimeError):
+        if self.on_error is None:
+            print(error, file=self.stdout)
+        else:
+            self.on_error(error)
 
     def stringify(self, object):
         if object is None:
@@ -190,50 +144,96 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
 
     def visit_assign_expr(self, expr: expressions.Assign):
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
-            self.environment.assign(expr.name, value)
+            self.globals.assign(expr.name, value)
         return value
 
     def visit_while_stmt(self, stmt: statements.While):
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            if self.execute(stmt.body) is RETURN:
+                return RETURN
+
+    def arity_error(self, paren: Token, expected, got):
+        return LoxRuntimeError(
+            paren,
+            "Expected " + str(expected) + " arguments but got " + str(got) + ".",
+        )
+
+    def stack_overflow(self, paren: Optional[Token] = None):
+        """Returns the error for a RecursionError while running Lox code.
+
+        Lox calls recurse in Python, so every engine but the VM runs out of
+        Python stack on deep recursion. Calls catch that themselves and pass
+        their paren, so the innermost call with enough stack left to raise
+        reports it. Handlers around a whole program only see recursion that
+        is not a call, and pass no token.
+        """
+        return LoxRuntimeError(paren, "Stack overflow.")
 
     def visit_call_expr(self, expr: expressions.Call):
-        callee = self.evaluate(expr.callee)
-        arguments = []
-        for argument in expr.arguments:
-            arguments.append(self.evaluate(argument))
-
+        try:
+            if type(expr.callee) is expressions.Get:
+                return self.call_method(expr, expr.callee)
+
+            callee = self.evaluate(expr.callee)
+            arguments = []
+            for argument in expr.arguments:
+                arguments.append(self.evaluate(argument))
+            return self.call_value(expr, callee, arguments)
+        except RecursionError:
+            raise self.stack_overflow(expr.paren) from None
+
+    def call_value(self, expr: expressions.Call, callee, arguments):
         if not isinstance(callee, LoxCallable):
             raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
 
         function: LoxCallable = callee
         if len(arguments) != function.arity():
-            raise LoxRuntimeError(
-                expr.paren,
-                "Expected "
-                + function.arity()
-                + " arguments but got "
-                + arguments.size()
-                + ".",
-            )
+            raise self.arity_error(expr.paren, function.arity(), len(arguments))
 
         return function.call(self, arguments)
 
+    def call_method(self, expr: expressions.Call, get: expressions.Get):
+        # obj.method(args) invokes the method with 'this' placed straight
+        # into its call frame instead of allocating a bound LoxFunction.
+        object = self.evaluate(get.obj)
+        if not isinstance(object, LoxInstance):
+            raise LoxRuntimeError(get.name, "Only instances have properties.")
+
+        name = get.name.lexeme
+        method = None
+        if name in object.fields:
+            callee = object.fields[name]
+        else:
+            method = get.cache.lookup(object.klass, name)
+            if method is None:
+                raise LoxRuntimeError(get.name, "Undefined property '" + name + "'.")
+
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append(self.evaluate(argument))
+
+        if method is None:
+            return self.call_value(expr, callee, arguments)
+        if len(arguments) != method.arity():
+            raise self.arity_error(expr.paren, method.arity(), len(arguments))
+
+        return method.invoke(self, object, arguments)
+
     def visit_return_stmt(self, stmt: statements.Return):
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
 
-        raise ReturnException(value)
+        self.return_value = value
+        return RETURN
 
     def visit_get_expr(self, expr: expressions.Get):
         object = self.evaluate(expr=expr.obj)
         if isinstance(object, LoxInstance):
-            return object.get(expr.name)
+            return object.get(expr.name, expr.cache)
 
         raise LoxRuntimeError(expr.name, "Only instances have properties.")
 
@@ -243,11 +243,11 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
         if expr.operator.type == TokenType.OR:
             if self.is_truthy(left):
                 return left
-            else:
-                if not self.is_truthy(left):
-                    return left
+        else:
+            if not self.is_truthy(left):
+                return left
 
-            return self.evaluate(expr.right)
+        return self.evaluate(expr.right)
 
     def visit_class_stmt(self, stmt: statements.Class):
 
@@ -259,11 +259,9 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
                     stmt.superclass.name, "Superclass must be a class."
                 )
 
-        self.environment.define(stmt.name.lexeme, None)
-
         if stmt.superclass is not None:
-            environment = Environment(self.environment)
-            environment.define("super", superclass)
+            self.environment = Environment(self.environment)
+            self.environment.define("super", superclass)
 
         methods = dict()
         for method in stmt.methods:
@@ -274,8 +272,8 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
 
         klass = LoxClass(stmt.name.lexeme, methods=methods, superclass=superclass)
         if superclass is not None:
-            environment = environment.enclosing
-        self.environment.assign(stmt.name, klass)
+            self.environment = self.environment.enclosing
+        self.environment.define(stmt.name.lexeme, klass)
         return None
 
     def visit_set_expr(self, expr: expressions.Set):
@@ -288,13 +286,13 @@ class Interpreter(expressions.ExprVisitor, statements.StmtVisitor):
         return value
 
     def visit_super_expr(self, expr: expressions.Super):
-        distance = self.locals[expr]
-        superclass = self.environment.get_at(distance, "super")
-        obj = self.environment.get_at(distance, -1, "this")
+        distance = expr.depth
+        superclass = self.environment.get_at(distance, expr.slot)
+        obj = self.environment.get_at(distance - 1, 0)
 
         method = superclass.find_method(expr.method.lexeme)
 
-        if method is not None:
+        if method is None:
             raise LoxRuntimeError(
                 expr.method, "Undefined property '" + expr.method.lexeme + "'."
             )
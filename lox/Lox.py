@@ -1,70 +1,239 @@
+import os
 from TokenType import TokenType
-from Scanner import Scanner
-from Parser import Parser, ParseError
-from ast_printer import ASTPrinter
 from Interpreter import Interpreter
-from pathlib import Path
-from Resolver import Resolver
+
+# The scanner, parser and their passes are imported by Lox.parse, so running
+# a cached or pre-parsed script never loads them or compiles the scanner's
+# regular expression. The re module itself still comes in through typing.
 
 
 class Lox:
-    had_error = False
-    had_runtime_error = False
-    interpreter = Interpreter()
+    """Runs scripts for the command line, printing any errors.
+
+    The error flags belong to the instance, and output goes to its stdout,
+    so separate Lox objects can run side by side without seeing each other's
+    output or errors. Given counters, the tree engine runs on an
+    InstrumentedInterpreter that counts into them; given a PhaseStats, each
+    phase of a run is measured into it.
+    """
+
+    def __init__(self, stdout=None, counters=None, stats=None) -> None:
+        self.stdout = stdout
+        self.counters = counters
+        self.stats = stats
+        self.had_error = False
+        self.had_runtime_error = False
 
     def report(self, line, where, message):
-        print("[line " + line + "] Error" + where + ": " + message)
-        Lox.had_error = True
+        print(
+            "[line " + str(line) + "] Error" + where + ": " + message, file=self.stdout
+        )
+        self.had_error = True
+
+    def scan_error(self, line, message):
+        self.report(line, "", message)
 
-    @staticmethod
     def error(self, token, message):
         if token.type == TokenType.EOF:
             self.report(token.line, " at end", message)
         else:
             self.report(token.line, " at '" + token.lexeme + "'", message)
 
-    @staticmethod
-    def runtime_error(err):
-        print(f"{err} \n [ Line : {err.token.line} ]")
+    def runtime_error(self, err):
+        print(err, file=self.stdout)
+        self.had_runtime_error = True
 
-    @staticmethod
-    def run(source):
-        scanner = Scanner(source)
+    def end_phase(self, name, **measures):
+        if self.stats is not None:
+            self.stats.end_phase(name, **measures)
+
+    def interpreter(self):
+        if self.counters is not None:
+            from InstrumentedInterpreter import InstrumentedInterpreter
+
+            return InstrumentedInterpreter(
+                self.counters, stdout=self.stdout, on_error=self.runtime_error
+            )
+        return Interpreter(stdout=self.stdout, on_error=self.runtime_error)
+
+    def parse(self, source, interpreter, optimize=True, resolver=None):
+        from FastScanner import FastScanner
+        from Parser import Parser
+
+        scanner = FastScanner(source, on_error=self.scan_error)
         tokens = scanner.scan_tokens()
+        self.end_phase("scan", tokens=tokens)
 
-        parser = Parser(tokens)
+        parser = Parser(tokens, on_error=self.error)
         statements = parser.parse()
+        self.end_phase("parse", parsed=statements)
+
+        if self.had_error:
+            return None
 
-        if Lox.had_error:
-            return
+        if resolver is None:
+            from Resolver import Resolver
 
-        # Lox.interpreter.interpret(statements=statements)
-        interpreter = Interpreter()
-        resolver = Resolver(interpreter=interpreter, on_error=Lox.error)
+            resolver = Resolver(interpreter=interpreter, on_error=self.error)
         resolver.resolve(statements=statements)
+        self.end_phase("resolve", resolved=statements)
+
+        if self.had_error:
+            return None
+
+        if optimize:
+            from Optimizer import Optimizer
 
-        if Lox.had_error:
-            return
+            statements = Optimizer().optimize(statements)
+            self.end_phase("optimize")
+        return statements
 
-        interpreter.interpret(statements=statements)
+    def run(self, source, engine="tree", optimize=True, max_depth=None):
+        interpreter = self.interpreter()
+        statements = self.parse(source, interpreter, optimize)
+        if statements is not None:
+            self.execute(statements, interpreter, engine, max_depth)
+
+    def execute(self, statements, interpreter, engine="tree", max_depth=None):
+        Lox.runner(interpreter, engine, max_depth).interpret(statements=statements)
+        self.end_phase("interpret")
 
     @staticmethod
-    def run_file(filename):
-        path = Path(filename).absolute()
-        source = path.read_text(encoding="utf-8", errors="strict")
-        Lox.run(source=source)
+    def runner(interpreter, engine="tree", max_depth=None):
+        """Returns the object whose interpret() runs statements on engine."""
+        if engine == "closure":
+            from ClosureCompiler import ClosureCompiler
+
+            return ClosureCompiler(interpreter)
+        if engine == "vm":
+            from VM import VM
+
+            return VM(interpreter, max_depth)
+        return interpreter
+
+    def run_file(
+        self, filename, engine="tree", optimize=True, max_depth=None, cache=True
+    ):
+        path = os.path.abspath(filename)
+        if path.endswith(".loxa"):
+            import sys
+            import ast_serializer
 
-        if Lox.had_error:
+            with open(path, "rb") as file:
+                data = file.read()
+            try:
+                statements = ast_serializer.loads(data)
+            except ValueError as error:
+                print("Cannot load " + filename + ": " + str(error), file=sys.stderr)
+                exit(65)
+            self.execute(statements, self.interpreter(), engine, max_depth)
+        else:
+            with open(path, encoding="utf-8", errors="strict") as file:
+                source = file.read()
+            self.end_phase("read")
+            if engine == "vm" and cache:
+                self.run_cached(path, source, optimize, max_depth)
+            else:
+                self.run(source, engine=engine, optimize=optimize, max_depth=max_depth)
+
+        if self.had_error:
             exit(65)
-        elif Lox.had_runtime_error:
+        elif self.had_runtime_error:
             exit(70)
 
-    @staticmethod
-    def run_prompt():
+    def compile_file(self, filename, output, optimize=True):
+        import ast_serializer
+
+        with open(filename, encoding="utf-8", errors="strict") as file:
+            source = file.read()
+        statements = self.parse(source, Interpreter(), optimize)
+        if statements is None:
+            exit(65)
+        with open(output, "wb") as file:
+            file.write(ast_serializer.dumps(statements))
+
+    def run_cached(self, path, source, optimize=True, max_depth=None):
+        from BytecodeCache import BytecodeCache
+        from BytecodeCompiler import BytecodeCompiler
+        from VM import VM
+
+        cache = BytecodeCache(path, optimize)
+        interpreter = self.interpreter()
+        chunk = cache.load(source)
+        phase = "load"
+        if chunk is None:
+            phase = "compile"
+            statements = self.parse(source, interpreter, optimize)
+            if statements is None:
+                return
+            chunk = BytecodeCompiler(interpreter).compile(statements)
+            cache.store(source, chunk)
+        self.end_phase(phase)
+
+        VM(interpreter, max_depth).execute(chunk)
+        self.end_phase("interpret")
+
+    def run_batch(
+        self, directory, jobs=None, engine="tree", optimize=True, max_depth=None
+    ):
+        """Runs every .lox file under directory on a pool of processes.
+
+        Each script's output is written in path order as soon as it and the
+        ones before it have finished, followed by a throughput summary.
+        """
+        import sys
+        import time
+        from concurrent.futures import ProcessPoolExecutor
+        from LoxRunner import run_script, start_worker
+
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(directory)
+            for name in names
+            if name.endswith(".lox")
+        )
+        start = time.perf_counter()
+        failed = 0
+        with ProcessPoolExecutor(
+            jobs,
+            initializer=start_worker,
+            initargs=(engine, optimize, max_depth),
+        ) as executor:
+            for path, (output, code) in zip(paths, executor.map(run_script, paths)):
+                status = "" if code == 0 else " (exit " + str(code) + ")"
+                print("== " + path + status, file=self.stdout)
+                print(output, end="", file=self.stdout, flush=True)
+                if code == 65:
+                    self.had_error = True
+                elif code == 70:
+                    self.had_runtime_error = True
+                failed += code != 0
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{len(paths)} scripts in {elapsed:.2f} s "
+            f"({len(paths) / elapsed:.1f} scripts/s), {failed} failed",
+            file=sys.stderr,
+        )
+        if self.had_error:
+            exit(65)
+        elif self.had_runtime_error:
+            exit(70)
+
+    def run_prompt(self, engine="tree", optimize=True, max_depth=None):
+        from LoxSession import LoxSession
+
+        session = LoxSession(
+            engine=engine, optimize=optimize, max_depth=max_depth, lox=self
+        )
         while True:
-            line = input(">> ")
-            if line is None or line == "exit":
+            try:
+                line = input(">> ")
+            except EOFError:
+                break
+            if line == "exit":
                 break
 
-            Lox.run(line)
-            Lox.had_error = False
+            session.run(line)
+            self.had_error = False
+            self.had_runtime_error = False
@@ -7,6 +7,14 @@ class LoxClass(LoxCallable) :
         self.methods = methods
         self.superclass = superclass
 
+        # Classes are immutable once created, so the inherited methods are
+        # flattened into one table here instead of walking the superclass
+        # chain on every lookup.
+        self.method_table = dict()
+        if superclass is not None:
+            self.method_table.update(superclass.method_table)
+        self.method_table.update(methods)
+
     def __str__(self) -> str:
         return self.name
 
@@ -14,16 +22,12 @@ class LoxClass(LoxCallable) :
         instance = LoxInstance(self)
         initializer = self.find_method("init")
         if initializer is not None: 
-            initializer.bind(instance).call(interpreter, arguments)
+            initializer.invoke(interpreter, instance, arguments)
 
         return instance
 
     def find_method(self, name): 
-        if name in self.methods.keys(): 
-            return self.methods[name]
-        
-        if self.superclass is not None : 
-            return self.superclass.find_method(name)
+        return self.method_table.get(name)
 
     def arity(self):
         initializer = self.find_method("init")
@@ -0,0 +1,181 @@
+from typing import List
+import expressions
+import statements
+from FastScanner import FastScanner
+from Interpreter import Interpreter
+from LoxCallable import LoxCallable
+from LoxInstance import LoxInstance
+from Optimizer import Optimizer
+from Parser import Parser
+from Resolver import Resolver
+from Rope import Rope
+from TokenType import TokenType
+
+
+class LoxError:
+    """A scan, parse or resolution error, reported as Lox.report prints it."""
+
+    __slots__ = ("line", "where", "message")
+
+    def __init__(self, line: int, where: str, message: str) -> None:
+        self.line = line
+        self.where = where
+        self.message = message
+
+    def __str__(self) -> str:
+        return "[line " + str(self.line) + "] Error" + self.where + ": " + self.message
+
+    def __repr__(self) -> str:
+        return f"LoxError({self.line!r}, {self.where!r}, {self.message!r})"
+
+
+class CompileError(Exception):
+    def __init__(self, errors: List[LoxError]) -> None:
+        super().__init__("\n".join(str(error) for error in errors))
+        self.errors = errors
+
+
+def lox_value(value):
+    """Returns the Lox value for a Python value given as a global."""
+    if type(value) is int:
+        return float(value)
+    if (
+        value is None
+        or type(value) in (bool, float, str)
+        or isinstance(value, (LoxCallable, LoxInstance))
+    ):
+        return value
+    raise TypeError("Not a Lox value: " + repr(value))
+
+
+def inline_caches(nodes) -> list:
+    """Returns the InlineCache of every property access under nodes."""
+    caches = []
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if type(node) is expressions.Get:
+            caches.append(node.cache)
+        for field in type(node).__slots__:
+            value = getattr(node, field)
+            if type(value) is list:
+                pending.extend(
+                    item
+                    for item in value
+                    if isinstance(item, (expressions.Expr, statements.Stmt))
+                )
+            elif isinstance(value, (expressions.Expr, statements.Stmt)):
+                pending.append(value)
+    return caches
+
+
+class Program:
+    """A compiled script that can be run any number of times.
+
+    Every run gets a fresh Interpreter, so runs share no globals and any
+    number of them can use the same Program. The VM's bytecode is compiled
+    once; the closure engine's closures are bound to the interpreter they
+    were compiled for, so they are built again for each run.
+
+    Property accesses cache the classes they have seen, and each run
+    creates new classes, so the caches are cleared before and after every
+    run. Otherwise sites would fill up with earlier runs' classes and keep
+    those runs' globals alive.
+    """
+
+    def __init__(self, statements: List[statements.Stmt], engine, max_depth) -> None:
+        self.statements = statements
+        self.engine = engine
+        self.max_depth = max_depth
+        self.chunk = None
+        self.caches = []
+        if engine == "vm":
+            from BytecodeCompiler import BytecodeCompiler
+
+            self.chunk = BytecodeCompiler(Interpreter()).compile(statements)
+        else:
+            self.caches = inline_caches(statements)
+
+    def clear_caches(self):
+        for cache in self.caches:
+            cache.clear()
+
+    def run(self, globals=None, stdout=None) -> dict:
+        """Runs the script and returns its global variables by name.
+
+        globals predefines variables: ints become Lox numbers, and values
+        Lox has no type for raise TypeError. print statements write to stdout
+        (sys.stdout by default). A runtime error raises LoxRuntimeError, with
+        the token of the failing call for a stack overflow on every engine.
+        Strings come back as str, even those built as a Rope.
+        """
+        interpreter = Interpreter(stdout)
+        if globals is not None:
+            interpreter.globals.values.update(
+                (name, lox_value(value)) for name, value in globals.items()
+            )
+
+        self.clear_caches()
+        try:
+            if self.engine == "vm":
+                from VM import VM
+
+                VM(interpreter, self.max_depth).run(self.chunk, interpreter.globals)
+            elif self.engine == "closure":
+                from ClosureCompiler import ClosureCompiler
+
+                for stmt in ClosureCompiler(interpreter).compile(self.statements):
+                    stmt(interpreter.globals)
+            else:
+                for stmt in self.statements:
+                    interpreter.execute(stmt)
+        except RecursionError:
+            raise interpreter.stack_overflow() from None
+        finally:
+            self.clear_caches()
+        values = interpreter.globals.values
+        for name, value in values.items():
+            if type(value) is Rope:
+                values[name] = str(value)
+        return values
+
+
+class LoxEngine:
+    """Compiles Lox source for use from Python.
+
+    Unlike Lox, errors are raised rather than printed, and nothing is kept
+    in class attributes, so separate engines and programs never interfere.
+    """
+
+    def __init__(self, engine="tree", optimize=True, max_depth=None) -> None:
+        self.engine = engine
+        self.optimize = optimize
+        self.max_depth = max_depth
+
+    def compile(self, source: str) -> Program:
+        """Scans, parses and resolves source, or raises CompileError."""
+        errors = []
+
+        def scan_error(line, message):
+            errors.append(LoxError(line, "", message))
+
+        def error(token, message):
+            if token.type == TokenType.EOF:
+                errors.append(LoxError(token.line, " at end", message))
+            else:
+                errors.append(
+                    LoxError(token.line, " at '" + token.lexeme + "'", message)
+                )
+
+        tokens = FastScanner(source, on_error=scan_error).scan_tokens()
+        statements = Parser(tokens, on_error=error).parse()
+        if not errors:
+            Resolver(interpreter=Interpreter(), on_error=error).resolve(statements)
+        if errors:
+            raise CompileError(errors)
+        if self.optimize:
+            statements = Optimizer().optimize(statements)
+        return Program(statements, self.engine, self.max_depth)
+
+    def run(self, source: str, globals=None, stdout=None) -> dict:
+        return self.compile(source).run(globals=globals, stdout=stdout)
@@ -1,7 +1,7 @@
 from LoxCallable import LoxCallable
 import statements
 from Environment import Environment
-from LoxReturn import ReturnException
+from LoxReturn import RETURN
 
 
 class LoxFunction(LoxCallable):
@@ -10,25 +10,32 @@ class LoxFunction(LoxCallable):
         declaration: statements.Function,
         closure: Environment,
         is_initializer: bool,
+        instance=None,
     ) -> None:
         super().__init__()
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        # Set on methods bound to an instance; it becomes slot 0 ('this') of
+        # every call frame.
+        self.instance = instance
 
     def call(self, interpreter, arguments):
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except ReturnException as rt:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return rt.value
+        if self.instance is not None:
+            arguments = [self.instance] + arguments
+        return self.execute(interpreter, Environment(self.closure, arguments))
 
+    def invoke(self, interpreter, instance, arguments):
+        # Calls a method on an instance without creating a bound copy first.
+        arguments.insert(0, instance)
+        return self.execute(interpreter, Environment(self.closure, arguments))
+
+    def execute(self, interpreter, environment: Environment):
+        completion = interpreter.execute_block(self.declaration.body, environment)
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return environment.values[0]
+        if completion is RETURN:
+            return interpreter.return_value
         return None
 
     def arity(self):
@@ -38,6 +45,6 @@ class LoxFunction(LoxCallable):
         return "<fn " + self.declaration.name.lexeme + ">"
 
     def bind(self, instance):
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        return LoxFunction(
+            self.declaration, self.closure, self.is_initializer, instance
+        )
@@ -7,13 +7,16 @@ class LoxInstance:
         self.fields = dict()
 
     def __str__(self) -> str:
-        return self.klass + " instance"
+        return self.klass.name + " instance"
 
-    def get(self, name):
-        if name.lexeme in self.fields.keys():
+    def get(self, name, cache=None):
+        if name.lexeme in self.fields:
             return self.fields[name.lexeme]
 
-        method = self.klass.find_method(name.lexeme)
+        if cache is not None:
+            method = cache.lookup(self.klass, name.lexeme)
+        else:
+            method = self.klass.find_method(name.lexeme)
         if method is not None:
             return method.bind(self)
 
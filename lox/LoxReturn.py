@@ -1,6 +1,6 @@
 
 
-class ReturnException(RuntimeError):
-    def __init__(self, value) -> None:
-        super().__init__(None, None)
-        self.value = value
\ No newline at end of file
+# Returned from statement execution once a 'return' statement has run, so the
+# enclosing blocks and loops stop early. The value being returned is left in
+# the engine's return_value attribute until the function call picks it up.
+RETURN = object()
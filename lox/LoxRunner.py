@@ -0,0 +1,91 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List
+from LoxEngine import CompileError, LoxEngine
+from LoxRuntimeError import LoxRuntimeError
+
+
+class RunResult:
+    """What one script printed, and the error that stopped it if any."""
+
+    __slots__ = ("output", "error")
+
+    def __init__(self, output: str, error=None) -> None:
+        self.output = output
+        self.error = error
+
+    @property
+    def exit_code(self) -> int:
+        """The code Lox.run_file exits with after a script's Lox error.
+
+        Only run_script records other errors, for a file it cannot read or
+        a failure inside the interpreter; the batch counts those as 70.
+        """
+        if self.error is None:
+            return 0
+        if isinstance(self.error, CompileError):
+            return 65
+        return 70
+
+
+class LoxRunner:
+    """Runs independent scripts on a thread pool.
+
+    Every script gets its own Program, Interpreter and output buffer, so
+    scripts running at the same time only share immutable module state.
+    Threads take turns holding the GIL: this keeps many small scripts
+    isolated within one process rather than making CPU-bound ones faster.
+    """
+
+    def __init__(
+        self, engine="tree", optimize=True, max_depth=None, workers=None
+    ) -> None:
+        self.engine = LoxEngine(engine, optimize, max_depth)
+        self.workers = workers
+
+    def run(self, source: str, globals=None) -> RunResult:
+        output = io.StringIO()
+        try:
+            self.engine.compile(source).run(globals=globals, stdout=output)
+        except (CompileError, LoxRuntimeError) as error:
+            return RunResult(output.getvalue(), error)
+        return RunResult(output.getvalue())
+
+    def run_all(self, sources: Iterable[str]) -> List[RunResult]:
+        """Runs every source and returns their results in the same order."""
+        with ThreadPoolExecutor(self.workers) as executor:
+            return list(executor.map(self.run, sources))
+
+
+# The runner of a batch worker process, created once by start_worker.
+worker_runner = None
+
+
+def start_worker(engine, optimize, max_depth):
+    global worker_runner
+    worker_runner = LoxRunner(engine, optimize, max_depth)
+    # An empty script imports the engine's modules before the first real one.
+    worker_runner.run("")
+
+
+def run_script(path):
+    """Runs one file in a batch worker and returns (output, exit code).
+
+    Lox errors are appended to the output as the command line prints them,
+    any other error after the name of its Python type.
+    """
+    try:
+        with open(path, encoding="utf-8", errors="strict") as file:
+            source = file.read()
+        result = worker_runner.run(source)
+    except Exception as error:
+        # A file that cannot be read, or a failure inside the interpreter,
+        # fails this script only instead of the whole batch.
+        result = RunResult("", error)
+    output = result.output
+    error = result.error
+    if isinstance(error, (CompileError, LoxRuntimeError)):
+        output += str(error) + "\n"
+    elif error is not None:
+        output += type(error).__name__ + ": " + str(error) + "\n"
+    return output, result.exit_code
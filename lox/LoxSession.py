@@ -0,0 +1,26 @@
+from Lox import Lox
+from Resolver import Resolver
+
+
+class LoxSession:
+    """Runs source a piece at a time against the same global state.
+
+    The Interpreter, Resolver and engine are created once, so functions,
+    classes and variables defined by one call to run are visible to the
+    next, and each call only scans, resolves and compiles its own source.
+    Errors are reported through lox, a new Lox by default.
+    """
+
+    def __init__(self, engine="tree", optimize=True, max_depth=None, lox=None):
+        self.optimize = optimize
+        self.lox = Lox() if lox is None else lox
+        self.interpreter = self.lox.interpreter()
+        self.resolver = Resolver(interpreter=self.interpreter, on_error=self.lox.error)
+        self.runner = Lox.runner(self.interpreter, engine, max_depth)
+
+    def run(self, source: str):
+        statements = self.lox.parse(
+            source, self.interpreter, self.optimize, resolver=self.resolver
+        )
+        if statements is not None:
+            self.runner.interpret(statements=statements)
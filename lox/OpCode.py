@@ -0,0 +1,67 @@
+from enum import IntEnum, auto
+
+
+class OpCode(IntEnum):
+    # Hot instructions come first; the VM tests them in this order.
+    GET_LOCAL = auto()
+    GET_GLOBAL = auto()
+    CONSTANT = auto()
+    POP_JUMP_IF_FALSE = auto()
+    CALL = auto()
+    INVOKE = auto()
+    RETURN = auto()
+    SET_LOCAL = auto()
+    SET_GLOBAL = auto()
+    ADD = auto()
+    SUBTRACT = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    POP = auto()
+    JUMP = auto()
+    LOOP = auto()
+    JUMP_IF_FALSE = auto()
+    JUMP_IF_TRUE = auto()
+    NIL = auto()
+    TRUE = auto()
+    FALSE = auto()
+    NOT = auto()
+    NEGATE = auto()
+    PRINT = auto()
+    DEFINE = auto()
+    PUSH_ENV = auto()
+    POP_ENV = auto()
+    GET_PROPERTY = auto()
+    SET_PROPERTY = auto()
+    GET_SUPER = auto()
+    FUNCTION = auto()
+    INHERIT = auto()
+    CLASS = auto()
+
+
+# Number of operand bytes following each instruction.
+OPERAND_WIDTHS = {
+    OpCode.GET_LOCAL: (2, 2),
+    OpCode.SET_LOCAL: (2, 2),
+    OpCode.GET_GLOBAL: (2,),
+    OpCode.SET_GLOBAL: (2,),
+    OpCode.CONSTANT: (2,),
+    OpCode.POP_JUMP_IF_FALSE: (4,),
+    OpCode.JUMP: (4,),
+    OpCode.LOOP: (4,),
+    OpCode.JUMP_IF_FALSE: (4,),
+    OpCode.JUMP_IF_TRUE: (4,),
+    OpCode.CALL: (1,),
+    OpCode.INVOKE: (2, 1),
+    OpCode.DEFINE: (2,),
+    OpCode.GET_PROPERTY: (2,),
+    OpCode.SET_PROPERTY: (2,),
+    OpCode.GET_SUPER: (2, 2),
+    OpCode.FUNCTION: (2,),
+    OpCode.CLASS: (2, 2),
+}
@@ -0,0 +1,173 @@
+from typing import List, Optional
+import expressions
+import statements
+from LoxRuntimeError import LoxRuntimeError
+from TokenType import TokenType
+from operators import is_truthy
+from Rope import Rope
+
+
+class Optimizer(expressions.ExprVisitor, statements.StmtVisitor):
+    """Folds constant expressions and drops unreachable branches.
+
+    Runs after Resolver.resolve, so branches it drops have still been
+    checked and optimizing never changes which programs compile. Dropped
+    branches are whole statements with their own scopes, so the slots the
+    Resolver gave the remaining variables stay valid. Nodes are rewritten in
+    place where possible; a statement that can never run is returned as None
+    and left out of its enclosing statement list.
+    """
+
+    def optimize(self, statements: List[statements.Stmt]) -> List[statements.Stmt]:
+        optimized = []
+        for stmt in statements:
+            if stmt is None:
+                # Keep the parser's placeholder for a statement it failed to
+                # parse so later passes still see the error.
+                optimized.append(stmt)
+                continue
+            stmt = self.optimize_statement(stmt)
+            if stmt is not None:
+                optimized.append(stmt)
+        return optimized
+
+    def optimize_statement(self, stmt: statements.Stmt) -> Optional[statements.Stmt]:
+        return stmt.accept(self)
+
+    def optimize_branch(self, stmt: statements.Stmt) -> statements.Stmt:
+        stmt = self.optimize_statement(stmt)
+        if stmt is None:
+            return statements.Block([])
+        return stmt
+
+    def optimize_expression(self, expr: expressions.Expr) -> expressions.Expr:
+        return expr.accept(self)
+
+    def visit_expression_stmt(self, stmt: statements.Expression):
+        stmt.expression = self.optimize_expression(stmt.expression)
+        return stmt
+
+    def visit_print_stmt(self, stmt: statements.Print):
+        stmt.expression = self.optimize_expression(stmt.expression)
+        return stmt
+
+    def visit_var_stmt(self, stmt: statements.Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self.optimize_expression(stmt.initializer)
+        return stmt
+
+    def visit_block_stmt(self, stmt: statements.Block):
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt
+
+    def visit_if_stmt(self, stmt: statements.If):
+        stmt.condition = self.optimize_expression(stmt.condition)
+        if isinstance(stmt.condition, expressions.Literal):
+            if is_truthy(stmt.condition.value):
+                return self.optimize_statement(stmt.then_branch)
+            if stmt.else_branch is not None:
+                return self.optimize_statement(stmt.else_branch)
+            return None
+
+        stmt.then_branch = self.optimize_branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.optimize_statement(stmt.else_branch)
+        return stmt
+
+    def visit_while_stmt(self, stmt: statements.While):
+        stmt.condition = self.optimize_expression(stmt.condition)
+        if isinstance(stmt.condition, expressions.Literal) and not is_truthy(
+            stmt.condition.value
+        ):
+            return None
+        stmt.body = self.optimize_branch(stmt.body)
+        return stmt
+
+    def visit_function_stmt(self, stmt: statements.Function):
+        stmt.body = self.optimize(stmt.body)
+        return stmt
+
+    def visit_return_stmt(self, stmt: statements.Return):
+        if stmt.value is not None:
+            stmt.value = self.optimize_expression(stmt.value)
+        return stmt
+
+    def visit_class_stmt(self, stmt: statements.Class):
+        for method in stmt.methods:
+            self.visit_function_stmt(method)
+        return stmt
+
+    def visit_literal_expr(self, expr: expressions.Literal):
+        return expr
+
+    def visit_grouping_expr(self, expr: expressions.Grouping):
+        return self.optimize_expression(expr.expression)
+
+    def visit_unary_expr(self, expr: expressions.Unary):
+        expr.right = self.optimize_expression(expr.right)
+        if not isinstance(expr.right, expressions.Literal):
+            return expr
+
+        value = expr.right.value
+        if expr.operator.type == TokenType.MINUS and type(value) is float:
+            return expressions.Literal(-value)
+        if expr.operator.type == TokenType.BANG:
+            return expressions.Literal(not is_truthy(value))
+        return expr
+
+    def visit_binary_expr(self, expr: expressions.Binary):
+        expr.left = self.optimize_expression(expr.left)
+        expr.right = self.optimize_expression(expr.right)
+        if not isinstance(expr.left, expressions.Literal) or not isinstance(
+            expr.right, expressions.Literal
+        ):
+            return expr
+
+        try:
+            value = expr.handler(expr.operator, expr.left.value, expr.right.value)
+        except (LoxRuntimeError, ArithmeticError):
+            # Leave the error to be reported when the expression runs.
+            return expr
+        if type(value) is Rope:
+            # Literals are written to the bytecode and syntax tree caches,
+            # which only store plain strings.
+            value = str(value)
+        return expressions.Literal(value)
+
+    def visit_logical_expr(self, expr: expressions.Logical):
+        expr.left = self.optimize_expression(expr.left)
+        expr.right = self.optimize_expression(expr.right)
+        if not isinstance(expr.left, expressions.Literal):
+            return expr
+
+        left_truthy = is_truthy(expr.left.value)
+        if expr.operator.type == TokenType.OR:
+            return expr.left if left_truthy else expr.right
+        return expr.right if left_truthy else expr.left
+
+    def visit_variable_expr(self, expr: expressions.Variable):
+        return expr
+
+    def visit_assign_expr(self, expr: expressions.Assign):
+        expr.value = self.optimize_expression(expr.value)
+        return expr
+
+    def visit_call_expr(self, expr: expressions.Call):
+        expr.callee = self.optimize_expression(expr.callee)
+        expr.arguments = [self.optimize_expression(arg) for arg in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr: expressions.Get):
+        expr.obj = self.optimize_expression(expr.obj)
+        return expr
+
+    def visit_set_expr(self, expr: expressions.Set):
+        expr.obj = self.optimize_expression(expr.obj)
+        expr.value = self.optimize_expression(expr.value)
+        return expr
+
+    def visit_this_expr(self, expr: expressions.This):
+        return expr
+
+    def visit_super_expr(self, expr: expressions.Super):
+        return expr
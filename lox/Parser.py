@@ -12,9 +12,10 @@ class ParseError(RuntimeError):
 
 
 class Parser:
-    def __init__(self, tokens: List[Token]):
+    def __init__(self, tokens: List[Token], on_error=None):
         self.tokens = tokens
         self.current = 0
+        self.on_error = on_error
 
     def expression(self) -> expressions.Expr:
         return self.assignment()
@@ -163,10 +164,12 @@ class Parser:
         if self.match(TokenType.NUMBER, TokenType.STRING):
             return expressions.Literal(self.previous().literal)
 
-        if self.match(TokenType.SUPER) : 
+        if self.match(TokenType.SUPER):
             keyword = self.previous()
             self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+            method = self.consume(
+                TokenType.IDENTIFIER, "Expect superclass method name."
+            )
             return expressions.Super(keyword=keyword, method=method)
 
         if self.match(TokenType.LEFT_PAREN):
@@ -186,6 +189,8 @@ class Parser:
         raise self.error(self.peek(), message)
 
     def error(self, token, message):
+        if self.on_error is not None:
+            self.on_error(token, message)
         return ParseError(token, message)
 
     def synchronize(self):
@@ -281,7 +286,7 @@ class Parser:
     def while_statement(self):
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self.expression()
-        self.consume(TokenType.RIGHT_BRACE, "Expect ')' after 'condition'.")
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after condition.")
         body = self.statement()
 
         return statements.While(condition, body)
@@ -386,8 +391,8 @@ class Parser:
         return statements.Var(name=name, initializer=initializer)
 
     def parse(self):
-        statements = list()
-        while not self.is_at_end():
-            statements.append(self.declaration())
+        return list(self.declarations())
 
-        return statements
+    def declarations(self):
+        while not self.is_at_end():
+            yield self.declaration()
@@ -0,0 +1,138 @@
+import time
+import tracemalloc
+from Environment import Environment
+from LoxInstance import LoxInstance
+import expressions
+import statements
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; the RSS column is left empty there.
+    resource = None
+
+COUNTED_CLASSES = (Environment, LoxInstance)
+
+
+def count_nodes(nodes):
+    """Returns the number of syntax tree nodes and of resolved references.
+
+    A reference is a variable, assignment, this or super expression the
+    Resolver bound to a local scope.
+    """
+    total = 0
+    resolved = 0
+    pending = list(nodes)
+    while pending:
+        node = pending.pop()
+        if node is None:
+            continue
+        total += 1
+        if getattr(node, "depth", None) is not None:
+            resolved += 1
+        for field in type(node).__slots__:
+            value = getattr(node, field)
+            if isinstance(value, list):
+                pending.extend(
+                    item
+                    for item in value
+                    if isinstance(item, (expressions.Expr, statements.Stmt))
+                )
+            elif isinstance(value, (expressions.Expr, statements.Stmt)):
+                pending.append(value)
+    return total, resolved
+
+
+class PhaseStats:
+    """Measures each phase Lox goes through to run a script.
+
+    Lox calls end_phase as each phase finishes. Every phase records its
+    wall time, the Environments and LoxInstances it created and the
+    process's peak RSS so far; with memory=True tracemalloc also records
+    each phase's peak Python memory, at some cost in speed. Allocations are
+    counted by wrapping __init__ of those classes until stop.
+    """
+
+    def __init__(self, memory=False) -> None:
+        self.memory = memory
+        self.phases = []
+        self.counts = dict.fromkeys(cls.__name__ for cls in COUNTED_CLASSES)
+        self.tokens = None
+        self.nodes = None
+        self.resolved = None
+
+    def start(self):
+        for name in self.counts:
+            self.counts[name] = 0
+        for cls in COUNTED_CLASSES:
+            cls.__init__ = self.counting_init(cls.__init__, cls.__name__)
+        if self.memory:
+            tracemalloc.start()
+        self.started = self.mark = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+        for cls in COUNTED_CLASSES:
+            cls.__init__ = cls.__init__.original
+        if self.memory:
+            tracemalloc.stop()
+
+    def counting_init(self, __init__, name):
+        counts = self.counts
+
+        def counting_init(self, *args):
+            counts[name] += 1
+            __init__(self, *args)
+
+        counting_init.original = __init__
+        return counting_init
+
+    def end_phase(self, name, tokens=None, parsed=None, resolved=None):
+        now = time.perf_counter()
+        peak = None
+        if self.memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        rss = None
+        if resource is not None:
+            # Kilobytes on Linux.
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.phases.append((name, now - self.mark, dict(self.counts), peak, rss))
+        for counted in self.counts:
+            self.counts[counted] = 0
+
+        if tokens is not None:
+            self.tokens = len(tokens)
+        if parsed is not None:
+            self.nodes = count_nodes(parsed)[0]
+        if resolved is not None:
+            self.resolved = count_nodes(resolved)[1]
+        # Counting is not part of the next phase.
+        self.mark = time.perf_counter()
+
+    def report(self, out=None):
+        print(f"\nStats: {self.elapsed * 1000:.1f} ms wall time", file=out)
+        sizes = [
+            f"{count} {label}"
+            for count, label in (
+                (self.tokens, "tokens"),
+                (self.nodes, "syntax tree nodes"),
+                (self.resolved, "resolved references"),
+            )
+            if count is not None
+        ]
+        print(", ".join(sizes) or "not scanned: the script was pre-compiled", file=out)
+        print(
+            f"\n{'phase':<10} {'ms':>9} {'%':>6} {'environments':>13} "
+            f"{'instances':>10} {'max RSS MB':>11} {'peak KB':>9}",
+            file=out,
+        )
+        total = sum(phase[1] for phase in self.phases) or 1
+        for name, spent, counts, peak, rss in self.phases:
+            print(
+                f"{name:<10} {spent * 1000:9.1f} {spent * 100 / total:6.1f} "
+                f"{counts['Environment']:13d} {counts['LoxInstance']:10d} "
+                f"{'-' if rss is None else format(rss / 1024, '.1f'):>11} "
+                f"{'-' if peak is None else format(peak / 1024, '.0f'):>9}",
+                file=out,
+            )
@@ -0,0 +1,230 @@
+import signal
+import time
+from collections import Counter, defaultdict
+from Token import Token
+
+SCRIPT = "<script>"
+
+# Attributes through which a syntax tree node refers to a token.
+TOKEN_FIELDS = ("name", "operator", "paren", "keyword")
+
+
+def frame_line(frame):
+    """Returns the line of the token or node a Python frame works on."""
+    for value in frame.f_locals.values():
+        if type(value) is Token:
+            return value.line
+        for field in TOKEN_FIELDS:
+            token = getattr(value, field, None)
+            if type(token) is Token:
+                return token.line
+    return None
+
+
+def function_label(name, line):
+    # Methods of different classes can share a name, so the line of the
+    # declaration tells them apart.
+    return name + ":" + str(line)
+
+
+class FunctionStats:
+    __slots__ = ("calls", "total", "self_time", "active")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.self_time = 0.0
+        # Number of calls of this function on the stack, so recursive calls
+        # only add their total time once.
+        self.active = 0
+
+
+class Profiler:
+    """Attributes the time a Lox program takes to its functions and lines.
+
+    Functions are named name:line after their declaration, so methods of
+    different classes that share a name are kept apart.
+
+    In "calls" mode the execute method of tree and closure engine functions
+    is wrapped while profiling, so every Lox call is counted and timed
+    without slowing down the rest of the interpreter. In "sample"
+    mode a SIGPROF timer interrupts the program every interval seconds of
+    CPU time and the Lox stack is read off the Python one; this is much
+    cheaper, works on every engine and also attributes time to lines. Each
+    sample is weighted by the CPU time since the previous one, as the timer
+    may fire less often than asked.
+    """
+
+    def __init__(self, mode="calls", interval=0.001) -> None:
+        self.mode = mode
+        self.interval = interval
+        self.functions = defaultdict(FunctionStats)
+        self.lines = Counter()
+        # Self time (or samples) for each stack, root first.
+        self.stacks = Counter()
+        self.elapsed = 0.0
+        self.samples = 0
+
+    def start(self):
+        from ClosureCompiler import CompiledFunction
+        from LoxFunction import LoxFunction
+        from VM import VM
+
+        self.function_classes = (LoxFunction, CompiledFunction)
+        self.function_codes = {cls.execute.__code__ for cls in self.function_classes}
+        self.vm_code = VM.run.__code__
+        self.stack = [SCRIPT]
+        # Start time and time spent in callees for each entry of self.stack.
+        self.timings = [[time.perf_counter(), 0.0]]
+        self.started = self.timings[0][0]
+        self.functions[SCRIPT].calls = 1
+        self.functions[SCRIPT].active = 1
+
+        if self.mode == "sample":
+            if not hasattr(signal, "setitimer"):
+                raise RuntimeError("Sampling needs signal.setitimer.")
+            self.last_sample = time.process_time()
+            signal.signal(signal.SIGPROF, self.sample)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        else:
+            for cls in self.function_classes:
+                cls.execute = self.timed(cls.execute)
+
+    def stop(self):
+        if self.mode == "sample":
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, signal.SIG_DFL)
+        else:
+            for cls in self.function_classes:
+                cls.execute = cls.execute.original
+            now = time.perf_counter()
+            while self.stack:
+                self.leave(now)
+        self.elapsed = time.perf_counter() - self.started
+
+    def timed(self, execute):
+        def timed_execute(function, *args):
+            declaration = function.declaration.name
+            name = function_label(declaration.lexeme, declaration.line)
+            stats = self.functions[name]
+            stats.calls += 1
+            stats.active += 1
+            self.stack.append(name)
+            self.timings.append([time.perf_counter(), 0.0])
+            try:
+                return execute(function, *args)
+            finally:
+                self.leave(time.perf_counter())
+
+        timed_execute.original = execute
+        return timed_execute
+
+    def leave(self, now):
+        start, children = self.timings.pop()
+        elapsed = now - start
+        self.stacks[tuple(self.stack)] += elapsed - children
+        name = self.stack.pop()
+        stats = self.functions[name]
+        stats.self_time += elapsed - children
+        stats.active -= 1
+        if stats.active <= 0:
+            stats.total += elapsed
+        if self.timings:
+            self.timings[-1][1] += elapsed
+
+    def sample(self, signum, frame):
+        now = time.process_time()
+        spent = now - self.last_sample
+        self.last_sample = now
+
+        stack, line = self.lox_stack(frame)
+        self.samples += 1
+        self.stacks[stack] += spent
+        self.lines[line] += spent
+        self.functions[stack[-1]].self_time += spent
+        for name in set(stack):
+            self.functions[name].total += spent
+
+    def lox_stack(self, frame):
+        """Returns the Lox call stack, root first, and the current line."""
+        names = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            if code is self.vm_code:
+                # The VM keeps its Lox frames in a list rather than on the
+                # Python stack.
+                values = frame.f_locals
+                chunk = values.get("chunk")
+                ip = values.get("ip")
+                frames = values.get("frames")
+                if chunk is None or ip is None or frames is None:
+                    # Sampled while run() was still setting up; its caller's
+                    # frames say where the program is.
+                    frame = frame.f_back
+                    continue
+                if line is None:
+                    line = chunk.line_at(ip - 1) or None
+                names.append(
+                    function_label(chunk.name, chunk.line)
+                    if values.get("function")
+                    else SCRIPT
+                )
+                for saved in reversed(frames):
+                    names.append(
+                        function_label(saved[0].name, saved[0].line)
+                        if saved[4]
+                        else SCRIPT
+                    )
+            elif code in self.function_codes:
+                declaration = frame.f_locals["self"].declaration.name
+                names.append(function_label(declaration.lexeme, declaration.line))
+            elif line is None:
+                line = frame_line(frame)
+            frame = frame.f_back
+
+        if not names or names[-1] != SCRIPT:
+            names.append(SCRIPT)
+        names.reverse()
+        return tuple(names), line
+
+    def report(self, out=None):
+        """Prints the functions, and in sample mode the lines, by self time."""
+        print(
+            f"\nProfile ({self.mode}): {self.elapsed * 1000:.1f} ms wall time", file=out
+        )
+        if self.mode == "sample":
+            cpu_time = sum(self.lines.values())
+            print(
+                f"{self.samples} samples over {cpu_time * 1000:.1f} ms of CPU time",
+                file=out,
+            )
+        print(f"\n{'calls':>9} {'total ms':>10} {'self ms':>10}  function", file=out)
+        by_self_time = sorted(
+            self.functions.items(), key=lambda item: item[1].self_time, reverse=True
+        )
+        for name, stats in by_self_time:
+            calls = stats.calls if self.mode == "calls" else "-"
+            print(
+                f"{calls:>9} {stats.total * 1000:10.1f} "
+                f"{stats.self_time * 1000:10.1f}  {name}",
+                file=out,
+            )
+
+        if self.mode == "sample":
+            print(f"\n{'line':>9} {'self ms':>10} {'%':>6}", file=out)
+            total = sum(self.lines.values()) or 1
+            for line, spent in self.lines.most_common():
+                print(
+                    f"{'?' if line is None else line:>9} {spent * 1000:10.1f} "
+                    f"{spent * 100 / total:6.1f}",
+                    file=out,
+                )
+
+    def write_stacks(self, path):
+        """Writes collapsed stacks with microsecond weights for flame graphs."""
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, spent in sorted(self.stacks.items()):
+                weight = round(spent * 1_000_000)
+                if weight > 0:
+                    file.write(";".join(stack) + " " + str(weight) + "\n")
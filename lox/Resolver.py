@@ -25,6 +25,7 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
         super().__init__()
         self.interpreter = interpreter
         self.scopes = deque()
+        self.slots = deque()
         self.on_error = on_error
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
@@ -41,9 +42,11 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
 
     def begin_scope(self):
         self.scopes.append({})
+        self.slots.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.slots.pop()
 
     def declare(self, name: Token):
         if len(self.scopes) == 0:
@@ -52,6 +55,7 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
         if name.lexeme in scope:
             self.on_error(name, "Already a variable with this name in this scope.")
         scope[name.lexeme] = False
+        self.slots[-1][name.lexeme] = len(self.slots[-1])
 
     def define(self, name: Token):
         if len(self.scopes) == 0:
@@ -59,10 +63,14 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
         scope = self.scopes[-1]
         scope[name.lexeme] = True
 
+    def define_implicit(self, name: str):
+        self.scopes[-1][name] = True
+        self.slots[-1][name] = len(self.slots[-1])
+
     def resolve_local(self, expr: expressions.Expr, name: Token):
-        for idx, scope in enumerate(reversed(self.scopes)):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, idx)
+        for idx, slots in enumerate(reversed(self.slots)):
+            if name.lexeme in slots:
+                self.interpreter.resolve(expr, idx, slots[name.lexeme])
                 return
 
     def resolve_function(self, function: statements.Function, type: FunctionType):
@@ -70,6 +78,9 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
         self.current_function = type
 
         self.begin_scope()
+        if type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            # Methods receive 'this' in slot 0 of their own frame.
+            self.define_implicit("this")
         for param in function.params:
             self.declare(param)
             self.define(param)
@@ -195,10 +206,7 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
 
         if stmt.superclass is not None:
             self.begin_scope()
-            self.scopes[-1]["super"] = True
-
-        self.begin_scope()
-        self.scopes[-1]["this"] = True
+            self.define_implicit("super")
 
         for method in stmt.methods:
             declaration = FunctionType.METHOD
@@ -206,7 +214,6 @@ class Resolver(expressions.ExprVisitor, statements.StmtVisitor):
                 declaration = FunctionType.INITIALIZER
             self.resolve_function(method, declaration)
 
-        self.end_scope()
         if stmt.superclass is not None:
             self.end_scope()
         self.current_class = enclosing_class
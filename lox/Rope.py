@@ -0,0 +1,102 @@
+# Concatenations shorter than this are copied as ordinary strings: below it
+# copying is cheaper than keeping the pieces.
+ROPE_THRESHOLD = 1024
+
+# Pieces a RopeBuffer collects before joining them into one chunk, so a
+# string built from many tiny pieces costs little more than the string.
+PENDING_PIECES = 256
+
+
+class RopeBuffer:
+    """The text shared by a Rope and the Ropes appended to it.
+
+    Text only ever grows at the end, so the first n characters never change
+    and a Rope can stand for a prefix of the buffer by its length alone.
+    """
+
+    __slots__ = ("chunks", "pending", "length")
+
+    def __init__(self, text: str) -> None:
+        self.chunks = [text]
+        self.pending = []
+        self.length = len(text)
+
+    def add(self, piece: str):
+        pending = self.pending
+        pending.append(piece)
+        self.length += len(piece)
+        if len(pending) >= PENDING_PIECES:
+            self.chunks.append("".join(pending))
+            pending.clear()
+
+    def text(self, length: int) -> str:
+        text = "".join(self.chunks + self.pending)
+        if length == self.length:
+            # Keep the joined text rather than the pieces it was made of.
+            self.chunks = [text]
+            self.pending.clear()
+            return text
+        return text[:length]
+
+
+class Rope:
+    """A Lox string built by '+', kept as pieces until it is read.
+
+    Appending to the most recent Rope of a buffer adds a piece to it, so a
+    loop doing s = s + x takes linear rather than quadratic time. Appending
+    to an older Rope copies its text into a new buffer first, so the newer
+    one is not overwritten. str() joins the text once and keeps it, and
+    equality and hashing go through it, so a Rope behaves exactly like the
+    str it stands for.
+    """
+
+    __slots__ = ("buffer", "length", "text")
+
+    def __init__(self, buffer: RopeBuffer) -> None:
+        self.buffer = buffer
+        self.length = buffer.length
+        self.text = None
+
+    def append(self, piece: str) -> "Rope":
+        buffer = self.buffer
+        if buffer.length != self.length:
+            buffer = RopeBuffer(str(self))
+        buffer.add(piece)
+        return Rope(buffer)
+
+    def __str__(self) -> str:
+        if self.text is None:
+            self.text = self.buffer.text(self.length)
+        return self.text
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        if type(other) is Rope:
+            return str(self) == str(other)
+        if type(other) is str:
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f"Rope({str(self)!r})"
+
+
+STRING_TYPES = (str, Rope)
+
+
+def concatenate(left, right):
+    """Returns the Lox string left + right, where both are str or Rope."""
+    if type(right) is Rope:
+        right = str(right)
+    if type(left) is Rope:
+        return left.append(right)
+    if len(left) + len(right) < ROPE_THRESHOLD:
+        return left + right
+    buffer = RopeBuffer(left)
+    buffer.add(right)
+    return Rope(buffer)
@@ -1,3 +1,4 @@
+from sys import intern
 from Token import Token
 from TokenType import TokenType
 
@@ -13,6 +14,7 @@ class Scanner:
         self.keywords = dict()
         self.keywords["and"] = TokenType.AND
         self.keywords["class"] = TokenType.CLASS
+        self.keywords["else"] = TokenType.ELSE
         self.keywords["false"] = TokenType.FALSE
         self.keywords["for"] = TokenType.FOR
         self.keywords["fun"] = TokenType.FUN
@@ -111,11 +113,9 @@ class Scanner:
         while self.is_alpha_numeric(self.peek()):
             self.advance()
 
-        text = self.source[self.start : self.current]
-        type = self.keywords[text] if text in self.keywords.keys() else None
-        if type is None:
-            type = TokenType.IDENTIFIER
-        self.add_token(type=type)
+        text = intern(self.source[self.start : self.current])
+        type = self.keywords.get(text, TokenType.IDENTIFIER)
+        self.tokens.append(Token(type=type, lexeme=text, literal=None, line=self.line))
 
     def scan_token(self):
         c = self.advance()
@@ -140,9 +140,7 @@ class Scanner:
         elif c == "*":
             self.add_token(TokenType.STAR)
         elif c == "!":
-            self.add_token(
-                TokenType.BANG_EQUAL if self.match("=") else TokenType.BANG_EQUAL
-            )
+            self.add_token(TokenType.BANG_EQUAL if self.match("=") else TokenType.BANG)
         elif c == "=":
             self.add_token(
                 TokenType.EQUAL_EQUAL if self.match("=") else TokenType.EQUAL
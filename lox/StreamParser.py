@@ -0,0 +1,35 @@
+from typing import Iterable
+from Parser import Parser
+from Token import Token
+from TokenType import TokenType
+
+
+class StreamParser(Parser):
+    """Parser reading its tokens from an iterator, such as
+    StreamScanner.scan_tokens().
+
+    The grammar needs only the current token and the one before it, so those
+    two are all that is kept. Use declarations() to get each top-level
+    statement as soon as it has been parsed.
+    """
+
+    def __init__(self, tokens: Iterable[Token], on_error=None):
+        super().__init__(None, on_error)
+        self.tokens = iter(tokens)
+        self.current_token = next(self.tokens)
+        self.previous_token = None
+
+    def advance(self):
+        if self.current_token.type != TokenType.EOF:
+            self.previous_token = self.current_token
+            self.current_token = next(self.tokens)
+        return self.previous_token
+
+    def is_at_end(self):
+        return self.current_token.type == TokenType.EOF
+
+    def peek(self):
+        return self.current_token
+
+    def previous(self):
+        return self.previous_token
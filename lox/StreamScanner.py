@@ -0,0 +1,43 @@
+from typing import Iterator, TextIO
+from FastScanner import FastScanner, TOKEN_PATTERN
+from Token import Token
+from TokenType import TokenType
+
+
+class StreamScanner(FastScanner):
+    """Scans a text file object lazily, a chunk at a time.
+
+    scan_tokens returns a generator instead of a list, so only the current
+    chunk and the lexeme being read are held in memory. A match that reaches
+    the last character of the buffer may continue in the next chunk (a long
+    identifier, '<' before '=', a string or comment cut in two), so it is
+    kept back and scanned again once more input has been read.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, reader: TextIO, chunk_size: int = CHUNK_SIZE, on_error=None):
+        super().__init__(None, on_error)
+        self.reader = reader
+        self.chunk_size = chunk_size
+
+    def scan_tokens(self) -> Iterator[Token]:
+        yield from self.tokens_from(self.matches())
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    def matches(self):
+        buffer = ""
+        while True:
+            chunk = self.reader.read(self.chunk_size)
+            buffer += chunk
+            start = len(buffer)
+            for match in TOKEN_PATTERN.finditer(buffer):
+                # One character of lookahead decides every lexeme, so only a
+                # match running up to the last character can be incomplete.
+                if chunk and match.end() >= len(buffer) - 1:
+                    start = match.start()
+                    break
+                yield match
+            buffer = buffer[start:]
+            if not chunk:
+                return
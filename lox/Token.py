@@ -1,7 +1,9 @@
 from TokenType import TokenType
 
 class Token() : 
-    
+    # Scripts produce one Token per lexeme, so they carry no __dict__.
+    __slots__ = ("type", "lexeme", "literal", "line")
+
     def __init__(self, type, lexeme, literal, line) : 
         self.type = type
         self.lexeme = lexeme
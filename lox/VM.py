@@ -0,0 +1,500 @@
+from typing import List
+import statements
+from BytecodeCompiler import BytecodeCompiler
+from Chunk import Chunk
+from Environment import Environment
+from Interpreter import Interpreter
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxInstance import LoxInstance
+from LoxRuntimeError import LoxRuntimeError
+from OpCode import OpCode
+from operators import is_equal
+from Rope import STRING_TYPES, concatenate
+from Token import Token
+from TokenType import TokenType
+
+GET_LOCAL = OpCode.GET_LOCAL.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+CONSTANT = OpCode.CONSTANT.value
+POP_JUMP_IF_FALSE = OpCode.POP_JUMP_IF_FALSE.value
+CALL = OpCode.CALL.value
+INVOKE = OpCode.INVOKE.value
+RETURN = OpCode.RETURN.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+POP = OpCode.POP.value
+JUMP = OpCode.JUMP.value
+LOOP = OpCode.LOOP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+JUMP_IF_TRUE = OpCode.JUMP_IF_TRUE.value
+NIL = OpCode.NIL.value
+TRUE = OpCode.TRUE.value
+FALSE = OpCode.FALSE.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+PRINT = OpCode.PRINT.value
+DEFINE = OpCode.DEFINE.value
+PUSH_ENV = OpCode.PUSH_ENV.value
+POP_ENV = OpCode.POP_ENV.value
+GET_PROPERTY = OpCode.GET_PROPERTY.value
+SET_PROPERTY = OpCode.SET_PROPERTY.value
+GET_SUPER = OpCode.GET_SUPER.value
+FUNCTION = OpCode.FUNCTION.value
+INHERIT = OpCode.INHERIT.value
+CLASS = OpCode.CLASS.value
+
+# Default limit on nested Lox calls before the VM reports a stack overflow.
+MAX_DEPTH = 10000
+
+
+class VMFunction(LoxCallable):
+    def __init__(
+        self, chunk: Chunk, closure: Environment, is_initializer: bool, instance=None
+    ):
+        super().__init__()
+        self.chunk = chunk
+        self.closure = closure
+        self.is_initializer = is_initializer
+        self.instance = instance
+
+    def call(self, interpreter, arguments):
+        if self.instance is not None:
+            arguments.insert(0, self.instance)
+        environment = Environment(self.closure, arguments)
+        return interpreter.run(self.chunk, environment, self)
+
+    def invoke(self, interpreter, instance, arguments):
+        arguments.insert(0, instance)
+        return interpreter.run(self.chunk, Environment(self.closure, arguments), self)
+
+    def arity(self):
+        return len(self.chunk.params)
+
+    def __str__(self) -> str:
+        return "<fn " + self.chunk.name + ">"
+
+    def bind(self, instance):
+        return VMFunction(self.chunk, self.closure, self.is_initializer, instance)
+
+
+class VM:
+    """Stack machine executing Chunks produced by BytecodeCompiler.
+
+    Calls between Lox functions and classes push a frame onto an explicit
+    frame list instead of recursing in Python, so recursion depth is bounded
+    by max_depth rather than by the Python stack. A call directly followed by
+    RETURN reuses the caller's frame. Native callables are invoked through
+    the regular LoxCallable interface with the VM as interpreter.
+    """
+
+    def __init__(self, interpreter: Interpreter, max_depth=None) -> None:
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        self.max_depth = MAX_DEPTH if max_depth is None else max_depth
+
+    def interpret(self, statements: List[statements.Stmt]):
+        self.execute(BytecodeCompiler(self.interpreter).compile(statements))
+
+    def execute(self, chunk: Chunk):
+        try:
+            self.run(chunk, self.globals)
+        except LoxRuntimeError as loxe:
+            self.interpreter.runtime_error(loxe)
+
+    def error(self, chunk: Chunk, ip, message):
+        # Every byte of an instruction carries the same line, so the last
+        # byte read identifies the failing instruction.
+        line = chunk.line_at(ip - 1)
+        return LoxRuntimeError(Token(TokenType.IDENTIFIER, "", None, line), message)
+
+    def run(self, chunk: Chunk, environment: Environment, function=None):
+        code = chunk.code
+        constants = chunk.constants
+        ip = 0
+        frames = []
+        frame = environment
+        max_depth = self.max_depth
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        globals = self.globals
+        global_values = globals.values
+        stringify = self.interpreter.stringify
+        stdout = self.interpreter.stdout
+
+        while True:
+            op = code[ip]
+            ip += 1
+
+            if op == GET_LOCAL:
+                depth = code[ip] << 8 | code[ip + 1]
+                slot = code[ip + 2] << 8 | code[ip + 3]
+                ip += 4
+                env = environment
+                while depth:
+                    env = env.enclosing
+                    depth -= 1
+                push(env.values[slot])
+
+            elif op == GET_GLOBAL:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                if name in global_values:
+                    push(global_values[name])
+                else:
+                    line = chunk.line_at(ip - 1)
+                    push(globals.get(Token(TokenType.IDENTIFIER, name, None, line)))
+
+            elif op == CONSTANT:
+                push(constants[code[ip] << 8 | code[ip + 1]])
+                ip += 2
+
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = (
+                        code[ip] << 24
+                        | code[ip + 1] << 16
+                        | code[ip + 2] << 8
+                        | code[ip + 3]
+                    )
+                else:
+                    ip += 4
+
+            elif op == CALL or op == INVOKE:
+                if op == CALL:
+                    argc = code[ip]
+                    ip += 1
+                    callee = stack[-1 - argc]
+                    receiver = None
+                else:
+                    name = constants[code[ip] << 8 | code[ip + 1]]
+                    argc = code[ip + 2]
+                    ip += 3
+                    receiver = stack[-1 - argc]
+                    if not isinstance(receiver, LoxInstance):
+                        raise self.error(chunk, ip, "Only instances have properties.")
+                    if name in receiver.fields:
+                        callee = receiver.fields[name]
+                        receiver = None
+                    else:
+                        callee = receiver.klass.find_method(name)
+                        if callee is None:
+                            raise self.error(
+                                chunk, ip, "Undefined property '" + name + "'."
+                            )
+                arguments = stack[len(stack) - argc :]
+                del stack[len(stack) - argc - 1 :]
+
+                if type(callee) is LoxClass:
+                    # Run the initializer in a frame of its own, like any
+                    # other Lox call, instead of through LoxClass.call.
+                    receiver = LoxInstance(callee)
+                    callee = callee.find_method("init")
+                    if callee is None:
+                        if argc != 0:
+                            raise self.error(
+                                chunk,
+                                ip,
+                                "Expected 0 arguments but got " + str(argc) + ".",
+                            )
+                        push(receiver)
+                        continue
+
+                if type(callee) is VMFunction:
+                    params = callee.chunk.params
+                    if argc != len(params):
+                        raise self.error(
+                            chunk,
+                            ip,
+                            "Expected "
+                            + str(len(params))
+                            + " arguments but got "
+                            + str(argc)
+                            + ".",
+                        )
+                    if receiver is None:
+                        receiver = callee.instance
+                    if receiver is not None:
+                        arguments.insert(0, receiver)
+                    if (
+                        code[ip] == RETURN
+                        and function is not None
+                        and not function.is_initializer
+                    ):
+                        # return f(...): the callee's result is ours, so it
+                        # takes over the current frame instead of a new one.
+                        pass
+                    elif len(frames) < max_depth:
+                        frames.append((chunk, ip, environment, frame, function))
+                    else:
+                        raise self.error(chunk, ip, "Stack overflow.")
+                    environment = frame = Environment(callee.closure, arguments)
+                    function = callee
+                    chunk = callee.chunk
+                    code = chunk.code
+                    constants = chunk.constants
+                    ip = 0
+                    continue
+
+                if not isinstance(callee, LoxCallable):
+                    raise self.error(chunk, ip, "Can only call functions and classes.")
+                if argc != callee.arity():
+                    raise self.error(
+                        chunk,
+                        ip,
+                        "Expected "
+                        + str(callee.arity())
+                        + " arguments but got "
+                        + str(argc)
+                        + ".",
+                    )
+                push(callee.call(self, arguments))
+
+            elif op == RETURN:
+                result = pop()
+                if function is not None and function.is_initializer:
+                    result = frame.values[0]
+                if not frames:
+                    return result
+                chunk, ip, environment, frame, function = frames.pop()
+                code = chunk.code
+                constants = chunk.constants
+                push(result)
+
+            elif op == SET_LOCAL:
+                depth = code[ip] << 8 | code[ip + 1]
+                slot = code[ip + 2] << 8 | code[ip + 3]
+                ip += 4
+                env = environment
+                while depth:
+                    env = env.enclosing
+                    depth -= 1
+                env.values[slot] = stack[-1]
+
+            elif op == SET_GLOBAL:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                if name in global_values:
+                    global_values[name] = stack[-1]
+                else:
+                    line = chunk.line_at(ip - 1)
+                    token = Token(TokenType.IDENTIFIER, name, None, line)
+                    globals.assign(token, stack[-1])
+
+            elif op == ADD:
+                right = pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif type(left) in STRING_TYPES and type(right) in STRING_TYPES:
+                    stack[-1] = concatenate(left, right)
+                else:
+                    raise self.error(
+                        chunk, ip, "Operands must be two numbers or two strings."
+                    )
+
+            elif op == SUBTRACT:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left - right
+
+            elif op == LESS:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left < right
+
+            elif op == LESS_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left <= right
+
+            elif op == GREATER:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left > right
+
+            elif op == GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left >= right
+
+            elif op == MULTIPLY:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                stack[-1] = left * right
+
+            elif op == DIVIDE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise self.error(chunk, ip, "Operands must be numbers.")
+                try:
+                    stack[-1] = left / right
+                except ZeroDivisionError:
+                    raise self.error(chunk, ip, "Division by zero.") from None
+
+            elif op == EQUAL:
+                right = pop()
+                stack[-1] = is_equal(stack[-1], right)
+
+            elif op == NOT_EQUAL:
+                right = pop()
+                stack[-1] = not is_equal(stack[-1], right)
+
+            elif op == POP:
+                pop()
+
+            elif op == JUMP or op == LOOP:
+                ip = (
+                    code[ip] << 24
+                    | code[ip + 1] << 16
+                    | code[ip + 2] << 8
+                    | code[ip + 3]
+                )
+
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = (
+                        code[ip] << 24
+                        | code[ip + 1] << 16
+                        | code[ip + 2] << 8
+                        | code[ip + 3]
+                    )
+                else:
+                    ip += 4
+
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is not None and value is not False:
+                    ip = (
+                        code[ip] << 24
+                        | code[ip + 1] << 16
+                        | code[ip + 2] << 8
+                        | code[ip + 3]
+                    )
+                else:
+                    ip += 4
+
+            elif op == NIL:
+                push(None)
+
+            elif op == TRUE:
+                push(True)
+
+            elif op == FALSE:
+                push(False)
+
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+
+            elif op == NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    raise self.error(chunk, ip, "Operand must be a number.")
+                stack[-1] = -value
+
+            elif op == PRINT:
+                print(stringify(pop()), file=stdout)
+
+            elif op == DEFINE:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                environment.define(name, pop())
+
+            elif op == PUSH_ENV:
+                environment = Environment(environment)
+
+            elif op == POP_ENV:
+                environment = environment.enclosing
+
+            elif op == GET_PROPERTY:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise self.error(chunk, ip, "Only instances have properties.")
+                if name in instance.fields:
+                    stack[-1] = instance.fields[name]
+                else:
+                    method = instance.klass.find_method(name)
+                    if method is None:
+                        raise self.error(
+                            chunk, ip, "Undefined property '" + name + "'."
+                        )
+                    stack[-1] = method.bind(instance)
+
+            elif op == SET_PROPERTY:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                ip += 2
+                value = pop()
+                instance = pop()
+                if not isinstance(instance, LoxInstance):
+                    raise self.error(chunk, ip, "Only instances have fields.")
+                instance.fields[name] = value
+                push(value)
+
+            elif op == GET_SUPER:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                distance = code[ip + 2] << 8 | code[ip + 3]
+                ip += 4
+                superclass = environment.get_at(distance, 0)
+                obj = environment.get_at(distance - 1, 0)
+                method = superclass.find_method(name)
+                if method is None:
+                    raise self.error(chunk, ip, "Undefined property '" + name + "'.")
+                push(method.bind(obj))
+
+            elif op == FUNCTION:
+                push(
+                    VMFunction(
+                        constants[code[ip] << 8 | code[ip + 1]], environment, False
+                    )
+                )
+                ip += 2
+
+            elif op == INHERIT:
+                superclass = stack[-1]
+                if not isinstance(superclass, LoxClass):
+                    raise self.error(chunk, ip, "Superclass must be a class.")
+                environment = Environment(environment, [superclass])
+
+            elif op == CLASS:
+                name = constants[code[ip] << 8 | code[ip + 1]]
+                count = code[ip + 2] << 8 | code[ip + 3]
+                ip += 4
+                methods = dict()
+                for method in stack[len(stack) - count :]:
+                    method.is_initializer = method.chunk.name == "init"
+                    methods[method.chunk.name] = method
+                del stack[len(stack) - count :]
+                superclass = pop()
+                push(LoxClass(name, methods=methods, superclass=superclass))
+
+            else:
+                raise self.error(chunk, ip, "Unknown opcode " + str(op) + ".")
@@ -0,0 +1,237 @@
+import hashlib
+import struct
+import sys
+from typing import List
+import expressions
+import statements
+from Token import Token
+from TokenType import TokenType
+
+MAGIC = b"LOXA"
+FORMAT_VERSION = 1
+
+# Every node class, in the order their index is written. Constructor
+# arguments are written in declaration order; depth and slot follow for the
+# nodes the Resolver annotates.
+NODE_CLASSES = (
+    expressions.Assign,
+    expressions.Binary,
+    expressions.Call,
+    expressions.Get,
+    expressions.Grouping,
+    expressions.Literal,
+    expressions.Logical,
+    expressions.Set,
+    expressions.Super,
+    expressions.This,
+    expressions.Unary,
+    expressions.Variable,
+    statements.Expression,
+    statements.Print,
+    statements.Var,
+    statements.Block,
+    statements.If,
+    statements.While,
+    statements.Function,
+    statements.Return,
+    statements.Class,
+)
+NODE_INDEX = {cls: index for index, cls in enumerate(NODE_CLASSES)}
+NODE_FIELDS = [
+    cls.__init__.__code__.co_varnames[1 : cls.__init__.__code__.co_argcount]
+    for cls in NODE_CLASSES
+]
+RESOLVED = [hasattr(cls, "depth") for cls in NODE_CLASSES]
+
+# Changing a node's fields or the numbering of token types changes the
+# fingerprint, so trees written for an older AST are rejected instead of
+# being misread.
+SCHEMA_FINGERPRINT = hashlib.sha256(
+    repr(
+        (
+            [(cls.__name__, fields) for cls, fields in zip(NODE_CLASSES, NODE_FIELDS)],
+            [(token_type.name, token_type.value) for token_type in TokenType],
+        )
+    ).encode()
+).digest()[:8]
+
+HEADER = struct.Struct("<4sH8s")
+FLOAT = struct.Struct("<d")
+
+# Value tags.
+NONE = 0
+FALSE = 1
+TRUE = 2
+NUMBER = 3
+STRING = 4
+TOKEN = 5
+LIST = 6
+NODE = 7
+
+
+class ASTWriter:
+    """Encodes resolved statements as a compact byte string.
+
+    Integers are LEB128 varints, strings go into a table written ahead of
+    the tree and are referred to by index, and each node is its class index
+    followed by its fields. Tokens keep their type, lexeme, literal and line
+    so error messages still point at the right place after loading.
+    """
+
+    def __init__(self) -> None:
+        self.out = bytearray()
+        self.strings = dict()
+
+    def dumps(self, program: List[statements.Stmt]) -> bytes:
+        self.write_value(program)
+        data = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, SCHEMA_FINGERPRINT))
+        self.write_int(len(self.strings), data)
+        for value in self.strings:
+            encoded = value.encode("utf-8")
+            self.write_int(len(encoded), data)
+            data += encoded
+        return bytes(data + self.out)
+
+    def write_int(self, value: int, out=None):
+        out = self.out if out is None else out
+        while value > 0x7F:
+            out.append(value & 0x7F | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def write_string(self, value: str):
+        self.write_int(self.strings.setdefault(value, len(self.strings)))
+
+    def write_value(self, value):
+        out = self.out
+        if value is None:
+            out.append(NONE)
+        elif value is True:
+            out.append(TRUE)
+        elif value is False:
+            out.append(FALSE)
+        elif type(value) is float:
+            out.append(NUMBER)
+            out += FLOAT.pack(value)
+        elif type(value) is str:
+            out.append(STRING)
+            self.write_string(value)
+        elif type(value) is Token:
+            out.append(TOKEN)
+            self.write_int(value.type.value)
+            self.write_string(value.lexeme)
+            self.write_value(value.literal)
+            self.write_int(value.line)
+        elif type(value) is list:
+            out.append(LIST)
+            self.write_int(len(value))
+            for item in value:
+                self.write_value(item)
+        else:
+            index = NODE_INDEX[type(value)]
+            out.append(NODE)
+            self.write_int(index)
+            for field in NODE_FIELDS[index]:
+                self.write_value(getattr(value, field))
+            if RESOLVED[index]:
+                # 0 marks a global, otherwise depth + 1.
+                self.write_int(0 if value.depth is None else value.depth + 1)
+                self.write_int(0 if value.slot is None else value.slot)
+
+
+class ASTReader:
+    """Decodes the output of ASTWriter back into statements."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.position = 0
+        self.strings = []
+
+    def loads(self) -> List[statements.Stmt]:
+        """Raises ValueError if data is not a tree ASTWriter wrote."""
+        try:
+            return self.read_program()
+        except (struct.error, IndexError, TypeError, UnicodeDecodeError) as error:
+            # Truncated or foreign data runs off the end or into bad values.
+            raise ValueError("Corrupt serialized syntax tree.") from error
+
+    def read_program(self) -> List[statements.Stmt]:
+        magic, version, fingerprint = HEADER.unpack_from(self.data, 0)
+        if (magic, version, fingerprint) != (
+            MAGIC,
+            FORMAT_VERSION,
+            SCHEMA_FINGERPRINT,
+        ):
+            raise ValueError("Not a serialized syntax tree for this interpreter.")
+        self.position = HEADER.size
+
+        for _ in range(self.read_int()):
+            length = self.read_int()
+            end = self.position + length
+            self.strings.append(
+                sys.intern(str(self.data[self.position : end], "utf-8"))
+            )
+            self.position = end
+        program = self.read_value()
+        if self.position != len(self.data):
+            raise ValueError("Corrupt serialized syntax tree.")
+        return program
+
+    def read_int(self) -> int:
+        data = self.data
+        result = data[self.position]
+        if result < 0x80:
+            self.position += 1
+            return result
+
+        result = 0
+        shift = 0
+        while True:
+            byte = data[self.position]
+            self.position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_value(self):
+        tag = self.data[self.position]
+        self.position += 1
+        if tag == NONE:
+            return None
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        if tag == NUMBER:
+            (value,) = FLOAT.unpack_from(self.data, self.position)
+            self.position += FLOAT.size
+            return value
+        if tag == STRING:
+            return self.strings[self.read_int()]
+        if tag == TOKEN:
+            type = TokenType(self.read_int())
+            lexeme = self.strings[self.read_int()]
+            literal = self.read_value()
+            return Token(type, lexeme, literal, self.read_int())
+        if tag == LIST:
+            return [self.read_value() for _ in range(self.read_int())]
+        if tag == NODE:
+            index = self.read_int()
+            node = NODE_CLASSES[index](*[self.read_value() for _ in NODE_FIELDS[index]])
+            if RESOLVED[index]:
+                depth = self.read_int()
+                slot = self.read_int()
+                if depth:
+                    node.depth = depth - 1
+                    node.slot = slot
+            return node
+        raise ValueError("Corrupt serialized syntax tree.")
+
+
+def dumps(program: List[statements.Stmt]) -> bytes:
+    return ASTWriter().dumps(program)
+
+
+def loads(data: bytes) -> List[statements.Stmt]:
+    return ASTReader(data).loads()
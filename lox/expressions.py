@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, List
-from Scanner import Scanner
 from Token import Token
+from operators import binary_handler
+from InlineCache import InlineCache
 
 
 class ExprVisitor(ABC):
@@ -55,31 +56,42 @@ class ExprVisitor(ABC):
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: ExprVisitor):
         pass
 
 
 class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot")
+
     def __init__(self, name: Token, value: Expr) -> None:
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_assign_expr(self)
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "handler")
+
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
         self.left = left
         self.operator = operator
         self.right = right
+        self.handler = binary_handler(operator.type)
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_binary_expr(self)
 
 
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+
     def __init__(self, callee: Expr, paren: Token, arguments: List[Expr]) -> None:
         self.callee = callee
         self.paren = paren
@@ -90,15 +102,20 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("obj", "name", "cache")
+
     def __init__(self, obj: Expr, name: Token) -> None:
         self.obj = obj
         self.name = name
+        self.cache = InlineCache()
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_get_expr(self)
 
 
 class Grouping(Expr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -107,6 +124,8 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: Any) -> None:
         self.value = value
 
@@ -115,6 +134,8 @@ class Literal(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right")
+
     def __init__(self, left: Expr, operator: Token, right: Expr) -> None:
         self.left = left
         self.operator = operator
@@ -125,6 +146,8 @@ class Logical(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("obj", "name", "value")
+
     def __init__(self, obj: Expr, name: Token, value: Expr) -> None:
         self.obj = obj
         self.name = name
@@ -135,23 +158,33 @@ class Set(Expr):
 
 
 class Super(Expr):
+    __slots__ = ("keyword", "method", "depth", "slot")
+
     def __init__(self, keyword: Token, method: Token) -> None:
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_super_expr(self)
 
 
 class This(Expr):
+    __slots__ = ("keyword", "depth", "slot")
+
     def __init__(self, keyword: Token) -> None:
         self.keyword = keyword
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_this_expr(self)
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right")
+
     def __init__(self, operator: Token, right: Expr) -> None:
         self.operator = operator
         self.right = right
@@ -161,8 +194,12 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
+
     def __init__(self, name: Token) -> None:
         self.name = name
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor) -> None:
         return visitor.visit_variable_expr(self)
@@ -1,16 +1,192 @@
-import argparse
 import sys
-from Scanner import Scanner
-from TokenType import TokenType
 from Lox import Lox
 
 
-if __name__ == "__main__":
+def main():
+    # A lone script needs none of the options, so skip importing argparse.
+    if len(sys.argv) == 2 and not sys.argv[1].startswith("-"):
+        Lox().run_file(filename=sys.argv[1])
+        return
+
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        usage="main.py [--engine ENGINE] [--no-opt] [--no-cache] [--max-depth N] "
+        "[--emit-ast FILE] [--batch DIR [--jobs N]] "
+        "[--profile [--sample [--sample-interval MS]] [--profile-stacks FILE]] "
+        "[--counters FILE] [--stats [--stats-memory]] [script]"
+    )
+    arg_parser.add_argument("script", nargs="?", help="Lox script to run.")
+    arg_parser.add_argument(
+        "--engine",
+        choices=("tree", "closure", "vm"),
+        default="tree",
+        help="Execution engine: the tree-walking interpreter, closure "
+        "compilation or the bytecode VM.",
+    )
+    arg_parser.add_argument(
+        "--no-opt",
+        action="store_true",
+        help="Skip constant folding and dead-branch elimination.",
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always compile the script instead of reusing the bytecode "
+        "cached in __loxcache__ by the VM engine.",
+    )
+    arg_parser.add_argument(
+        "--emit-ast",
+        metavar="FILE",
+        help="Write the parsed and resolved script to FILE instead of running "
+        "it. A .loxa file is run directly, without parsing.",
+    )
+    arg_parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="Maximum depth of nested Lox calls in the VM before it reports "
+        "a stack overflow.",
+    )
+    arg_parser.add_argument(
+        "--batch",
+        metavar="DIR",
+        help="Run every .lox file under DIR on a pool of worker processes.",
+    )
+    arg_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of worker processes for --batch (default: one per CPU).",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report the calls to and time spent in each Lox function on "
+        "stderr. Every call is timed, so only the tree and closure engines "
+        "can be profiled this way.",
+    )
+    arg_parser.add_argument(
+        "--sample",
+        action="store_true",
+        help="Profile by sampling the Lox stack instead, which costs much "
+        "less, works on every engine and also reports time per line.",
+    )
+    arg_parser.add_argument(
+        "--sample-interval",
+        metavar="MS",
+        type=float,
+        default=1.0,
+        help="Milliseconds of CPU time between samples.",
+    )
+    arg_parser.add_argument(
+        "--profile-stacks",
+        metavar="FILE",
+        help="Also write the profile to FILE as collapsed stacks for flame "
+        "graph tools.",
+    )
+    arg_parser.add_argument(
+        "--counters",
+        metavar="FILE",
+        help="Count the nodes executed, operators applied, environments "
+        "created and methods bound by the tree engine, and write them to FILE "
+        "as JSON at exit.",
+    )
+    arg_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Report the time, allocations and memory of each phase (scan, "
+        "parse, resolve, interpret, ...) on stderr.",
+    )
+    arg_parser.add_argument(
+        "--stats-memory",
+        action="store_true",
+        help="Also trace the peak Python memory of each phase, which makes "
+        "every phase slower.",
+    )
+    args = arg_parser.parse_args()
+    if args.emit_ast is not None and args.script is None:
+        arg_parser.error("--emit-ast needs a script")
+    if args.batch is not None and args.script is not None:
+        arg_parser.error("--batch does not take a script")
+    if (args.profile or args.sample) and args.script is None:
+        arg_parser.error("--profile needs a script")
+    if args.profile and not args.sample and args.engine == "vm":
+        arg_parser.error("the VM makes no Python calls to time; use --sample")
+    if args.counters is not None and (args.script is None or args.engine != "tree"):
+        arg_parser.error("--counters needs a script and the tree engine")
+    if (args.stats or args.stats_memory) and args.script is None:
+        arg_parser.error("--stats needs a script")
+
+    if args.batch is not None:
+        Lox().run_batch(
+            args.batch,
+            jobs=args.jobs,
+            engine=args.engine,
+            optimize=not args.no_opt,
+            max_depth=args.max_depth,
+        )
+    elif args.emit_ast is not None:
+        Lox().compile_file(args.script, args.emit_ast, optimize=not args.no_opt)
+    elif args.profile or args.sample:
+        from Profiler import Profiler
+
+        mode = "sample" if args.sample else "calls"
+        profiler = Profiler(mode, args.sample_interval / 1000)
+        profiler.start()
+        try:
+            Lox().run_file(
+                filename=args.script,
+                engine=args.engine,
+                optimize=not args.no_opt,
+                max_depth=args.max_depth,
+                cache=not args.no_cache,
+            )
+        finally:
+            profiler.stop()
+            profiler.report(sys.stderr)
+            if args.profile_stacks is not None:
+                profiler.write_stacks(args.profile_stacks)
+    elif args.counters is not None:
+        from InstrumentedInterpreter import Counters
 
-    if len(sys.argv) > 2:
-        print("Usage: jlox [script]")
-        exit(64)
-    elif len(sys.argv) == 2:
-        Lox.run_file(filename=sys.argv[1])
+        counters = Counters()
+        try:
+            Lox(counters=counters).run_file(
+                filename=args.script, optimize=not args.no_opt
+            )
+        finally:
+            with open(args.counters, "w", encoding="utf-8") as file:
+                counters.dump(file)
+    elif args.stats or args.stats_memory:
+        from PhaseStats import PhaseStats
+
+        stats = PhaseStats(memory=args.stats_memory)
+        stats.start()
+        try:
+            Lox(stats=stats).run_file(
+                filename=args.script,
+                engine=args.engine,
+                optimize=not args.no_opt,
+                max_depth=args.max_depth,
+                cache=not args.no_cache,
+            )
+        finally:
+            stats.stop()
+            stats.report(sys.stderr)
+    elif args.script is not None:
+        Lox().run_file(
+            filename=args.script,
+            engine=args.engine,
+            optimize=not args.no_opt,
+            max_depth=args.max_depth,
+            cache=not args.no_cache,
+        )
     else:
-        Lox.run_prompt()
+        Lox().run_prompt(
+            engine=args.engine, optimize=not args.no_opt, max_depth=args.max_depth
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+from LoxRuntimeError import LoxRuntimeError
+from Rope import STRING_TYPES, concatenate
+from TokenType import TokenType
+
+
+def is_truthy(obj):
+    return obj is not None and obj is not False
+
+
+def is_equal(a, b):
+    if a is None and b is None:
+        return True
+    if a is None:
+        return False
+    return a == b
+
+
+def add(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left + right
+    if type(left) in STRING_TYPES and type(right) in STRING_TYPES:
+        return concatenate(left, right)
+    raise LoxRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+
+def subtract(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left - right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def multiply(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left * right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def divide(operator, left, right):
+    if type(left) is float and type(right) is float:
+        try:
+            return left / right
+        except ZeroDivisionError:
+            raise LoxRuntimeError(operator, "Division by zero.") from None
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def greater(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left > right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def greater_equal(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left >= right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def less(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left < right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def less_equal(operator, left, right):
+    if type(left) is float and type(right) is float:
+        return left <= right
+    raise LoxRuntimeError(operator, "Operands must be numbers.")
+
+
+def equal(operator, left, right):
+    return is_equal(left, right)
+
+
+def not_equal(operator, left, right):
+    return not is_equal(left, right)
+
+
+def unknown(operator, left, right):
+    return None
+
+
+# Binary nodes look their handler up here once, when they are built, so
+# evaluating one is a single call instead of a scan over operator types.
+BINARY_OPERATORS = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: divide,
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.BANG_EQUAL: not_equal,
+}
+
+
+def binary_handler(operator_type: TokenType):
+    return BINARY_OPERATORS.get(operator_type, unknown)
@@ -17,14 +17,42 @@ class StmtVisitor(ABC):
     def visit_var_stmt(self, expr: "Stmt"):
         pass
 
+    @abstractmethod
+    def visit_block_stmt(self, expr: "Stmt"):
+        pass
+
+    @abstractmethod
+    def visit_if_stmt(self, expr: "Stmt"):
+        pass
+
+    @abstractmethod
+    def visit_while_stmt(self, expr: "Stmt"):
+        pass
+
+    @abstractmethod
+    def visit_function_stmt(self, expr: "Stmt"):
+        pass
+
+    @abstractmethod
+    def visit_return_stmt(self, expr: "Stmt"):
+        pass
+
+    @abstractmethod
+    def visit_class_stmt(self, expr: "Stmt"):
+        pass
+
 
 class Stmt(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor: StmtVisitor):
         pass
 
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -33,6 +61,8 @@ class Expression(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -41,6 +71,8 @@ class Print(Stmt):
 
 
 class Var(Stmt):
+    __slots__ = ("name", "initializer")
+
     def __init__(self, name: Token, initializer: Expr) -> None:
         self.name = name
         self.initializer = initializer
@@ -50,6 +82,8 @@ class Var(Stmt):
 
 
 class Block(Stmt):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: List[Expr]) -> None:
         self.statements = statements
 
@@ -58,6 +92,8 @@ class Block(Stmt):
 
 
 class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(
         self, condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]
     ) -> None:
@@ -70,6 +106,8 @@ class If(Stmt):
 
 
 class While(Stmt):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: Expr, body: Stmt) -> None:
         self.condition = condition
         self.body = body
@@ -79,6 +117,8 @@ class While(Stmt):
 
 
 class Function(Stmt):
+    __slots__ = ("name", "params", "body")
+
     def __init__(self, name: Token, params: List[Token], body: List[Stmt]) -> None:
         self.name = name
         self.params = params
@@ -89,6 +129,8 @@ class Function(Stmt):
 
 
 class Return(Stmt):
+    __slots__ = ("keyword", "value")
+
     def __init__(self, keyword: Token, value: Expr) -> None:
         self.keyword = keyword
         self.value = value
@@ -98,6 +140,8 @@ class Return(Stmt):
 
 
 class Class(Stmt):
+    __slots__ = ("name", "methods", "superclass")
+
     def __init__(
         self, name: Token, methods: List[Function], superclass: Variable
     ) -> None:
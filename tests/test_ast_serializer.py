@@ -0,0 +1,53 @@
+import io
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "lox"))
+
+import ast_serializer
+from Interpreter import Interpreter
+from Lox import Lox
+
+PRACTISE_FILES = sorted((ROOT / "practise_files").glob("*.lox"))
+
+
+def compile_source(source):
+    statements = Lox().parse(source, Interpreter())
+    if statements is None:
+        raise AssertionError("practise file does not compile")
+    return ast_serializer.dumps(statements)
+
+
+class ASTSerializerTest(unittest.TestCase):
+    def test_round_trip_is_stable(self):
+        for path in PRACTISE_FILES:
+            with self.subTest(path=path.name):
+                data = compile_source(path.read_text(encoding="utf-8"))
+                again = ast_serializer.dumps(ast_serializer.loads(data))
+                self.assertEqual(again, data)
+
+    def test_engines_print_the_same_from_loxa(self):
+        for path in PRACTISE_FILES:
+            source = path.read_text(encoding="utf-8")
+            data = compile_source(source)
+            for engine in ("tree", "closure", "vm"):
+                with self.subTest(path=path.name, engine=engine):
+                    expected = io.StringIO()
+                    Lox(stdout=expected).run(source, engine=engine)
+
+                    output = io.StringIO()
+                    lox = Lox(stdout=output)
+                    lox.execute(ast_serializer.loads(data), lox.interpreter(), engine)
+                    self.assertEqual(output.getvalue(), expected.getvalue())
+
+    def test_corrupt_data_is_rejected(self):
+        data = compile_source('var greeting = "hello"; print greeting;')
+        for corrupt in (b"", b"hello", data[:20], data[:-1], data + b"\0"):
+            with self.assertRaises(ValueError):
+                ast_serializer.loads(corrupt)
+
+
+if __name__ == "__main__":
+    unittest.main()
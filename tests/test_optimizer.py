@@ -0,0 +1,50 @@
+import io
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "lox"))
+
+from LoxEngine import CompileError, LoxEngine
+
+REJECTED = (
+    "if (false) { return 1; }",
+    "while (false) print this;",
+    "if (true) print 1; else { var a = 1; var a = 2; }",
+    "fun f() { if (false) { print super.x; } }",
+)
+
+ACCEPTED = """
+{
+  var a = 1;
+  if (false) { var b = 2; print b; } else { var c = 3; print a + c; }
+  var d = 4;
+  print a + d;
+}
+for (var i = 0; false; ) print i;
+print 1 + 2;
+"""
+
+
+class OptimizerTest(unittest.TestCase):
+    def test_dropped_branches_are_still_checked(self):
+        for source in REJECTED:
+            for optimize in (True, False):
+                with self.subTest(source=source, optimize=optimize):
+                    with self.assertRaises(CompileError):
+                        LoxEngine(optimize=optimize).compile(source)
+
+    def test_optimized_output_matches(self):
+        for engine in ("tree", "closure", "vm"):
+            with self.subTest(engine=engine):
+                outputs = []
+                for optimize in (True, False):
+                    output = io.StringIO()
+                    LoxEngine(engine, optimize).run(ACCEPTED, stdout=output)
+                    outputs.append(output.getvalue())
+                self.assertEqual(outputs[0], "4\n5\n3\n")
+                self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+LOX = Path(__file__).resolve().parent.parent / "lox"
+sys.path.insert(0, str(LOX))
+
+from LoxRunner import LoxRunner
+from LoxRuntimeError import LoxRuntimeError
+
+SCRIPT = """
+var total = 0;
+class Counter {{
+  init(start) {{ this.count = start; }}
+  add(n) {{ this.count = this.count + n; return this; }}
+}}
+fun label(n) {{ return "script {index}: " + n; }}
+var counter = Counter({index});
+for (var i = 0; i < 200; i = i + 1) {{
+  total = total + i * {index};
+  counter.add(1);
+}}
+print label(total);
+print counter.count;
+"""
+
+
+def scripts():
+    sources = [SCRIPT.format(index=index) for index in range(40)]
+    sources.append('print "before"; print missing;')
+    sources.append("print 1/0;")
+    sources.append("var = 1;")
+    return sources
+
+
+class LoxRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_concurrent_runs_match_solo_runs(self):
+        sources = scripts()
+        for engine in ("tree", "closure", "vm"):
+            with self.subTest(engine=engine):
+                runner = LoxRunner(engine, workers=8)
+                solo = [runner.run(source) for source in sources]
+                # Switch threads as often as possible so scripts interleave.
+                sys.setswitchinterval(1e-6)
+                try:
+                    together = runner.run_all(sources)
+                finally:
+                    sys.setswitchinterval(self.switch_interval)
+
+                self.assertEqual(len(together), len(sources))
+                for expected, result in zip(solo, together):
+                    self.assertEqual(result.output, expected.output)
+                    self.assertEqual(result.exit_code, expected.exit_code)
+                    self.assertEqual(str(result.error), str(expected.error))
+
+    def test_exit_codes_match_run_file(self):
+        runner = LoxRunner()
+        cases = (
+            ("print 1;", 0),
+            ("var = 1;", 65),
+            ("print missing;", 70),
+            ("print 1/0;", 70),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            script = Path(directory) / "script.lox"
+            for source, code in cases:
+                with self.subTest(source=source):
+                    script.write_text(source)
+                    process = subprocess.run(
+                        [sys.executable, "main.py", str(script)],
+                        cwd=LOX,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL,
+                    )
+                    self.assertEqual(process.returncode, code)
+                    self.assertEqual(runner.run(source).exit_code, code)
+
+    def test_division_by_zero_is_a_lox_error(self):
+        error = LoxRunner().run("print 1/0;").error
+        self.assertIsInstance(error, LoxRuntimeError)
+        self.assertEqual(str(error), "Division by zero.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,11 +16,16 @@ DEFAULT_IMPORTS = ("from abc import ABC, abstractmethod",)
 
 EXPRESSIONS_IMPORTS = DEFAULT_IMPORTS + (
     "from typing import Any, List",
-    "from lox.scanner import Scanner",
-    "from lox.tokens import Token",
+    "from Token import Token",
+    "from operators import binary_handler",
+    "from InlineCache import InlineCache",
 )
 
-STATEMENTS_IMPORTS: Tuple[str] = DEFAULT_IMPORTS + ("from lox.expressions import Expr",)
+STATEMENTS_IMPORTS: Tuple[str] = DEFAULT_IMPORTS + (
+    "from typing import List, Optional",
+    "from Token import Token",
+    "from expressions import Expr, Variable",
+)
 
 EXPRESSIONS = {
     "Assign": ("name: Token", "value: Expr"),
@@ -42,19 +47,37 @@ STATEMENTS: ASTDict = {
     "Print": ("expression: Expr",),
     "Var": ("name: Token", "initializer: Expr"),
     "Block": ("statements: List[Expr]",),
-    "If": ("condition: Expr, then_branch: Stmt, else_branch: Optional[Stmt]",),
-    "While": ("condition: Expr, body: Stmt",),
-    "Function": ("name: Token, params: List[Token], body: List[Stmt]",),
-    "Return": ("keyword: Token, value: Expr",),
-    "Class": (
-        "name: Token, methods: List[Function], superclass: expressions.Variable",
-    ),
+    "If": ("condition: Expr", "then_branch: Stmt", "else_branch: Optional[Stmt]"),
+    "While": ("condition: Expr", "body: Stmt"),
+    "Function": ("name: Token", "params: List[Token]", "body: List[Stmt]"),
+    "Return": ("keyword: Token", "value: Expr"),
+    "Class": ("name: Token", "methods: List[Function]", "superclass: Variable"),
+}
+
+# Attributes that are not constructor arguments, with their initial value.
+# depth and slot are the scope distance and variable index the Resolver
+# assigns to a local; they stay None for globals.
+RESOLVED = ("depth = None", "slot = None")
+
+EXPRESSIONS_EXTRA: ASTDict = {
+    "Assign": RESOLVED,
+    "Binary": ("handler = binary_handler(operator.type)",),
+    "Get": ("cache = InlineCache()",),
+    "Super": RESOLVED,
+    "This": RESOLVED,
+    "Variable": RESOLVED,
 }
 
 INDENTATION = "    "
 
 
-def define_ast(path: Path, base_name: str, types: ASTDict, imports: Tuple[str]):
+def define_ast(
+    path: Path,
+    base_name: str,
+    types: ASTDict,
+    imports: Tuple[str],
+    extra: ASTDict,
+):
 
     name = base_name.title()
     visitor = f"{base_name}Visitor"
@@ -65,6 +88,8 @@ def define_ast(path: Path, base_name: str, types: ASTDict, imports: Tuple[str]):
         file.write("\n\n")
         file.write(f"class {name}(ABC):")
         file.write("\n")
+        file.write(f"{INDENTATION}__slots__ = ()")
+        file.write("\n\n")
         file.write(f"{INDENTATION}@abstractmethod")
         file.write("\n")
         file.write(f"{INDENTATION}def accept(self, visitor: {visitor}):")
@@ -74,7 +99,7 @@ def define_ast(path: Path, base_name: str, types: ASTDict, imports: Tuple[str]):
 
         for class_name, fields in types.items():
             file.write("\n")
-            define_type(file, name, class_name, fields)
+            define_type(file, name, class_name, fields, extra.get(class_name, ()))
             file.write("\n")
 
 
@@ -83,19 +108,32 @@ def define_imports(file: TextIO, lines: Tuple[str]) -> None:
 
 
 def define_type(
-    file: TextIO, base_name: str, class_name: str, fields: Tuple[str]
+    file: TextIO,
+    base_name: str,
+    class_name: str,
+    fields: Tuple[str],
+    extra: Tuple[str] = (),
 ) -> None:
+    attrs = [field.split(":")[0] for field in fields]
+    attrs += [field.split(" = ")[0] for field in extra]
+
     file.write(f"class {class_name}({base_name}):")
     file.write("\n")
     file.write(f"{INDENTATION}")
+    file.write(f"__slots__ = {tuple(attrs)!r}".replace("'", '"'))
+    file.write("\n\n")
+    file.write(f"{INDENTATION}")
     file.write(f'def __init__(self, {", ".join(fields)}) -> None:')
     file.write("\n")
 
-    for field in fields:
-        attr = field.split(":")[0]
+    for attr in attrs[: len(fields)]:
         file.write(f"{INDENTATION * 2}self.{attr} = {attr}")
         file.write("\n")
 
+    for field in extra:
+        file.write(f"{INDENTATION * 2}self.{field}")
+        file.write("\n")
+
     file.write("\n")
     file.write(f"{INDENTATION}")
     file.write(f"def accept(self, visitor: {base_name}Visitor) -> None:")
@@ -124,11 +162,17 @@ def define_visitor(file: TextIO, base_name: str, types: Iterable[str]) -> None:
 
 
 def main():
-    path = Path(args=args.output).resolve()
+    path = Path(args.output).resolve()
     if not path.is_dir():
         arg_parser.error("Output must be a valid directory")
-    define_ast(path / "expressions.py", "Expr", EXPRESSIONS, EXPRESSIONS_IMPORTS)
-    define_ast(path / "statements.py", "Stmt", STATEMENTS, STATEMENTS_IMPORTS)
+    define_ast(
+        path / "expressions.py",
+        "Expr",
+        EXPRESSIONS,
+        EXPRESSIONS_IMPORTS,
+        EXPRESSIONS_EXTRA,
+    )
+    define_ast(path / "statements.py", "Stmt", STATEMENTS, STATEMENTS_IMPORTS, {})
 
 
 if __name__ == "__main__":